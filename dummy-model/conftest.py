@@ -0,0 +1,7 @@
+"""The model imports the task registry, which is copied next to it in the image."""
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "evaluation")
+)
@@ -1,76 +1,127 @@
 """Python Model Example"""
 
 import os
+import queue
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 import pandas as pd
 import typer
+from task_registry import ID_COL, TASK_SPECS
 from typing_extensions import Annotated
 
-ADNC_CATEGORIES = ["Not AD", "Low", "Intermediate", "High"]
-BRAAK_CATEGORIES = [
-    "Braak 0",
-    "Braak I",
-    "Braak II",
-    "Braak III",
-    "Braak IV",
-    "Braak V",
-    "Braak VI",
-]
-CERAD_CATEGORIES = ["Absent", "Sparse", "Moderate", "Frequent"]
-THAL_CATEGORIES = ["Thal 0", "Thal 1", "Thal 2", "Thal 3", "Thal 4"]
-LATE_CATEGORIES = ["Not Identified", "LATE Stage 1", "LATE Stage 2", "LATE Stage 3"]
-LEWY_CATEGORIES = [
-    "Not Identified (olfactory bulb assessed)",
-    "Olfactory bulb only",
-    "Amygdala-predominant",
-    "Brainstem-predominant",
-    "Limbic (Transitional)",
-    "Neocortical (Diffuse)",
-]
-
-
-def predict(df: pd.DataFrame) -> pd.DataFrame:
+SEED = 2025
+# Most chunks submitted for prediction but not yet written, whatever the
+# number of workers, so that peak memory does not grow with the CPU count.
+MAX_PENDING_CHUNKS = 4
+
+
+def predict(df: pd.DataFrame, seed: np.random.SeedSequence) -> pd.DataFrame:
     """Sample prediction function.
 
     TODO: Replace this with your actual model prediction logic. In this
     example, random values are assigned.
+
+    `seed` is specific to this block of rows; each target draws from its
+    own stream spawned from it, so the output does not depend on which
+    process handles the block, or in which order.
     """
-    pred = df.loc[:, ["Donor ID"]].copy()
-    np.random.seed(2025)  # For reproducibility
-
-    # Task 1
-    pred["predicted ADNC"] = np.random.choice(ADNC_CATEGORIES, size=len(df))
-    pred["predicted Braak"] = np.random.choice(BRAAK_CATEGORIES, size=len(df))
-    pred["predicted CERAD"] = np.random.choice(CERAD_CATEGORIES, size=len(df))
-    pred["predicted Thal"] = np.random.choice(THAL_CATEGORIES, size=len(df))
-    pred["predicted LATE"] = np.random.choice(LATE_CATEGORIES, size=len(df))
-    pred["predicted Lewy"] = np.random.choice(LEWY_CATEGORIES, size=len(df))
-
-    # Task 2
-    pred["predicted 6e10"] = np.random.uniform(low=0, high=100, size=len(df))
-    pred["predicted AT8"] = np.random.uniform(low=0, high=100, size=len(df))
-    pred["predicted GFAP"] = np.random.uniform(low=0, high=100, size=len(df))
-    pred["predicted NeuN"] = np.random.uniform(low=0, high=100, size=len(df))
-    pred["predicted aSyn"] = np.random.uniform(low=0, high=100, size=len(df))
-    pred["predicted pTDP43"] = np.random.uniform(low=0, high=100, size=len(df))
+    pred = df.loc[:, [ID_COL]].copy()
+
+    targets = [
+        target
+        for task in TASK_SPECS.values()
+        for target in task.targets + task.optional_targets
+    ]
+    for target, target_seed in zip(targets, seed.spawn(len(targets))):
+        rng = np.random.default_rng(target_seed)
+        if target.is_ordinal:
+            pred[target.pred_col] = rng.choice(target.labels, size=len(df))
+        else:
+            low, high = target.value_range
+            pred[target.pred_col] = rng.uniform(low=low, high=high, size=len(df))
     return pred
 
 
+def prefetch(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Read the next chunk in a background thread while this one is used.
+
+    At most one chunk is read ahead, so memory stays bounded.
+    """
+    buffer = queue.Queue(maxsize=1)
+    done = object()
+
+    def read():
+        try:
+            for chunk in chunks:
+                buffer.put(chunk)
+        except Exception as err:
+            buffer.put(err)
+        buffer.put(done)
+
+    threading.Thread(target=read, daemon=True).start()
+    while (chunk := buffer.get()) is not done:
+        if isinstance(chunk, Exception):
+            raise chunk
+        yield chunk
+
+
+def write_chunk(pred: pd.DataFrame, output_file: str, first: bool) -> None:
+    """Write the header with the first chunk, then append."""
+    pred.to_csv(output_file, mode="w" if first else "a", header=first, index=False)
+
+
 def main(
     input_dir: Annotated[str, typer.Option()] = "/input",
     output_dir: Annotated[str, typer.Option()] = "/output",
+    chunksize: Annotated[
+        int, typer.Option(help="Number of donors to read and predict at a time.")
+    ] = 10_000,
+    workers: Annotated[
+        int,
+        typer.Option(
+            help=f"Number of worker processes (at most {MAX_PENDING_CHUNKS}). "
+            "Defaults to the number of CPUs available."
+        ),
+    ] = 0,
 ):
     """
-    Run inference using data in input_dir and output predictions to output_dir.
+    Run inference using data in input_dir in chunks, streaming predictions
+    to output_dir.
+
+    Chunks are predicted in parallel by a pool of worker processes while
+    the next chunk is read and finished ones are written, in order. At
+    most MAX_PENDING_CHUNKS chunks are being predicted at a time, plus one
+    read ahead, so peak memory is a small multiple of `chunksize` rather
+    than the size of the input data. Every chunk gets its own seed,
+    spawned from SEED in input order, so the predictions are identical for
+    any number of workers.
     """
-    # data = pd.read_csv(os.path.join(input_dir, "data.csv"))
-    data = pd.read_csv("template.csv")
-    predictions = predict(data)
-    predictions.to_csv(
-        os.path.join(output_dir, "predictions.csv"),
-        index=False,
-    )
+    # input_file = os.path.join(input_dir, "data.csv")
+    input_file = "template.csv"
+    output_file = os.path.join(output_dir, "predictions.csv")
+    if not workers:
+        # CPUs this process may run on (e.g. as limited by `docker --cpuset-cpus`).
+        workers = len(os.sched_getaffinity(0))
+    root_seed = np.random.SeedSequence(SEED)
+    chunks = pd.read_csv(input_file, chunksize=chunksize)
+
+    with ProcessPoolExecutor(max_workers=min(workers, MAX_PENDING_CHUNKS)) as pool:
+        pending = deque()
+        first = True
+        for chunk in prefetch(chunks):
+            (chunk_seed,) = root_seed.spawn(1)
+            pending.append(pool.submit(predict, chunk, chunk_seed))
+            # Bound the number of chunks in flight.
+            if len(pending) >= MAX_PENDING_CHUNKS:
+                write_chunk(pending.popleft().result(), output_file, first=first)
+                first = False
+        while pending:
+            write_chunk(pending.popleft().result(), output_file, first=first)
+            first = False
 
 
 if __name__ == "__main__":
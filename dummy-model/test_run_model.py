@@ -0,0 +1,28 @@
+"""Tests for the dummy model."""
+import pandas as pd
+import pytest
+import run_model
+from task_registry import ID_COL
+
+
+def run(tmp_path, workers):
+    output_dir = tmp_path / f"output_{workers}"
+    output_dir.mkdir()
+    run_model.main(
+        input_dir=str(tmp_path),
+        output_dir=str(output_dir),
+        chunksize=7,
+        workers=workers,
+    )
+    return pd.read_csv(output_dir / "predictions.csv")
+
+
+@pytest.mark.parametrize("workers", [2, 3, 8])
+def test_predictions_do_not_depend_on_workers(tmp_path, monkeypatch, workers):
+    monkeypatch.chdir(tmp_path)  # The model reads template.csv from there.
+    pd.DataFrame({ID_COL: [f"donor_{i}" for i in range(100)]}).to_csv(
+        "template.csv", index=False
+    )
+    expected = run(tmp_path, workers=1)
+    assert len(expected) == 100
+    pd.testing.assert_frame_equal(run(tmp_path, workers=workers), expected)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Thin client for the resident validation and scoring service.
+
+Takes the same options as `validate.py` and `score.py` and writes the
+same results JSON file, but sends the request to the service started
+with `service.py` so that no heavy libraries are imported here. When no
+service is running, the request is handled in-process instead; when the
+service fails to handle the request, the error is reported and the
+client exits with a non-zero status.
+"""
+import importlib
+import json
+
+import typer
+from service import COMMANDS, ServiceError, request_results
+from typing_extensions import Annotated
+
+
+def main(
+    command: Annotated[
+        str,
+        typer.Argument(help=f"One of: {', '.join(COMMANDS)}."),
+    ],
+    predictions_file: Annotated[
+        str,
+        typer.Option(
+            "-p",
+            "--predictions_file",
+            help="Path to the prediction file.",
+        ),
+    ],
+    groundtruth_file: Annotated[
+        str,
+        typer.Option(
+            "-g",
+            "--groundtruth_file",
+            help="Path to the groundtruth file.",
+        ),
+    ],
+    task_number: Annotated[
+        int,
+        typer.Option(
+            "-t",
+            "--task_number",
+            help="Challenge task number for which to validate the predictions file.",
+        ),
+    ] = 9616048,
+    output_file: Annotated[
+        str,
+        typer.Option(
+            "-o",
+            "--output_file",
+            help="Path to save the results JSON file.",
+        ),
+    ] = "results.json",
+):
+    """Validates or scores the predictions file, preferably via the service."""
+    if command not in COMMANDS:
+        raise typer.BadParameter(
+            f"Expecting one of: {', '.join(COMMANDS)}.", param_hint="COMMAND"
+        )
+    try:
+        res = request_results(
+            command,
+            task_number=task_number,
+            gt_file=groundtruth_file,
+            pred_file=predictions_file,
+        )
+    except ServiceError as err:
+        typer.echo(f"Service failed to handle the request: {err}", err=True)
+        raise typer.Exit(code=1)
+    if res is None:
+        res = importlib.import_module(command).get_results(
+            task_number=task_number,
+            gt_file=groundtruth_file,
+            pred_file=predictions_file,
+        )
+
+    with open(output_file, "w", encoding="utf-8") as out:
+        out.write(json.dumps(res))
+    print(res["submission_status"])
+
+
+if __name__ == "__main__":
+    # Prevent replacing underscore with dashes in CLI names.
+    typer.main.get_command_name = lambda name: name
+    typer.run(main)
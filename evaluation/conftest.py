@@ -0,0 +1,49 @@
+"""Shared test fixtures: synthetic groundtruth and prediction files."""
+import numpy as np
+import pandas as pd
+import pytest
+from task_registry import GROUNDTRUTH_COLS, ID_COL, TARGET_SPECS, Task
+
+
+def _make_groundtruth(n_donors: int = 50, seed: int = 0) -> pd.DataFrame:
+    """Random groundtruth for every target, with all GROUNDTRUTH_COLS."""
+    rng = np.random.default_rng(seed)
+    truth = pd.DataFrame({ID_COL: [f"donor_{i}" for i in range(n_donors)]})
+    for target in TARGET_SPECS.values():
+        if target.is_ordinal:
+            truth[target.truth_col] = rng.choice(target.labels, size=n_donors)
+        else:
+            truth[target.truth_col] = rng.uniform(0, 100, size=n_donors)
+    truth["Cognitive Status"] = "Dementia"
+    return truth[[*GROUNDTRUTH_COLS]]
+
+
+def _make_predictions(truth: pd.DataFrame, task: Task) -> pd.DataFrame:
+    """Predictions equal to the groundtruth, for every target of `task`."""
+    pred = truth[[ID_COL]].copy()
+    for target in task.targets_in(task.usecols):
+        pred[target.pred_col] = truth[target.truth_col]
+    return pred
+
+
+@pytest.fixture
+def make_groundtruth():
+    return _make_groundtruth
+
+
+@pytest.fixture
+def make_predictions():
+    return _make_predictions
+
+
+@pytest.fixture
+def write_files(tmp_path):
+    """Write groundtruth and predictions CSVs; returns their paths."""
+
+    def write(truth: pd.DataFrame, pred: pd.DataFrame) -> tuple[str, str]:
+        gt_file, pred_file = tmp_path / "groundtruth.csv", tmp_path / "predictions.csv"
+        truth.to_csv(gt_file, index=False)
+        pred.to_csv(pred_file, index=False)
+        return str(gt_file), str(pred_file)
+
+    return write
@@ -0,0 +1,82 @@
+"""Donor ID integrity checks and alignment.
+
+Validation needs to know whether the predictions contain duplicate,
+missing or unknown donor IDs, and scoring needs to line predictions up
+with the groundtruth. Both are answered by a single lookup of the
+prediction IDs in a hashed index of the groundtruth IDs, which is built
+once per groundtruth file and cached (see `service.py`).
+"""
+import os
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+from task_registry import ID_COL
+
+
+class KeyCheck(NamedTuple):
+    """Outcome of `check_keys`.
+
+    `positions` holds, for each groundtruth donor (in groundtruth order),
+    the row of its prediction, or -1 if it has none. For duplicate IDs,
+    the first prediction is used.
+    """
+
+    errors: list[str]
+    positions: np.ndarray
+
+
+def build_index(ids) -> pd.Index:
+    """Index of groundtruth IDs, with its hash table built up front."""
+    index = pd.Index(ids, name=ID_COL)
+    if not index.is_unique:
+        raise ValueError("Groundtruth contains duplicate IDs.")
+    return index
+
+
+@lru_cache(maxsize=8)
+def _read_truth_index(gt_file: str, mtime: float) -> pd.Index:
+    """Read and index the groundtruth IDs.
+
+    `mtime` is only used as part of the cache key, so that a long-lived
+    process picks up a groundtruth file that has been replaced on disk.
+    """
+    ids = pd.read_csv(gt_file, usecols=[ID_COL], dtype={ID_COL: str})[ID_COL]
+    return build_index(ids)
+
+
+def load_truth_index(gt_file: str) -> pd.Index:
+    """Return the (cached) index of groundtruth IDs."""
+    return _read_truth_index(gt_file, os.path.getmtime(gt_file))
+
+
+def check_keys(truth_index: pd.Index, pred_ids: pd.Series) -> KeyCheck:
+    """Check prediction IDs for duplicate, missing and unknown IDs.
+
+    Error messages match those of `cnb_tools.validation_toolkit`'s
+    `check_duplicate_keys`, `check_missing_keys` and `check_unknown_keys`.
+    """
+    pred_ids = np.asarray(pred_ids, dtype=object)
+    rows = truth_index.get_indexer(pred_ids)
+    known = rows >= 0
+    counts = np.bincount(rows[known], minlength=len(truth_index))
+
+    # Only unknown IDs need hashing again to find their duplicates.
+    n_duplicate = (counts[counts > 1] - 1).sum() + (
+        pd.Series(pred_ids[~known]).duplicated().sum()
+    )
+    n_missing = (counts == 0).sum()
+    n_unknown = (~known).sum()
+    errors = []
+    if n_duplicate:
+        errors.append(f"Found {n_duplicate} duplicate ID(s)")
+    if n_missing:
+        errors.append(f"Found {n_missing} missing ID(s)")
+    if n_unknown:
+        errors.append(f"Found {n_unknown} unknown ID(s)")
+
+    positions = np.full(len(truth_index), -1)
+    # Reversed, so that the first prediction of a duplicate ID is written last.
+    positions[rows[known][::-1]] = np.flatnonzero(known)[::-1]
+    return KeyCheck(errors=errors, positions=positions)
@@ -1,30 +1,10 @@
 # import anndata as ad
 import numpy as np
-import pandas as pd
 from scipy import stats
-from sklearn.metrics import (
-    cohen_kappa_score,
-    mean_absolute_error,
-    mean_squared_error,
-    r2_score,
-)
-
-discrete_metrics = ["Braak", "Thal", "ADNC", "CERAD"]
-continous_metrics = ["6e10", "AT8", "NeuN", "GFAP"]
-ordinal_regression_order = {
-    "Braak": [
-        "Braak 0",
-        "Braak I",
-        "Braak II",
-        "Braak III",
-        "Braak IV",
-        "Braak V",
-        "Braak VI",
-    ],
-    "Thal": ["Thal 0", "Thal 1", "Thal 2", "Thal 3", "Thal 4", "Thal 5"],
-    "ADNC": ["Not AD", "Low", "Intermediate", "High"],
-    "CERAD": ["Absent", "Sparse", "Moderate", "Frequent"],
-}
+from task_registry import TASK_SPECS
+
+TASK1 = TASK_SPECS["task1"]
+TASK2 = TASK_SPECS["task2"]
 
 
 def concordance_correlation_coefficient(y_true, y_pred):
@@ -39,45 +19,158 @@ def concordance_correlation_coefficient(y_true, y_pred):
     return ccc
 
 
-def goal1_evaluation(df_adata, df):
+def _masked_moments(y_true, y_pred, mask):
+    """Column-wise means, population variances and covariance.
+
+    All arrays are (n_samples, n_targets); only entries where `mask` is
+    True contribute to each column.
+    """
+    n = mask.sum(axis=0)
+    y_true = np.where(mask, y_true, 0.0)
+    y_pred = np.where(mask, y_pred, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_true = y_true.sum(axis=0) / n
+        mean_pred = y_pred.sum(axis=0) / n
+        dev_true = np.where(mask, y_true - mean_true, 0.0)
+        dev_pred = np.where(mask, y_pred - mean_pred, 0.0)
+        var_true = (dev_true**2).sum(axis=0) / n
+        var_pred = (dev_pred**2).sum(axis=0) / n
+        cov = (dev_true * dev_pred).sum(axis=0) / n
+    return mean_true, mean_pred, var_true, var_pred, cov
+
+
+def _pearson(var_true, var_pred, cov):
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return cov / np.sqrt(var_true * var_pred)
+
+
+def quadratic_weighted_kappa(confusion):
+    """QWK from confusion matrices of shape (..., n_classes, n_classes).
+
+    Matches `sklearn.metrics.cohen_kappa_score(weights="quadratic")`,
+    which only considers the labels present in either input: classes with
+    no observations are skipped when computing the weights.
+    """
+    confusion = np.asarray(confusion, dtype=float)
+    row_sums = confusion.sum(axis=-1)
+    col_sums = confusion.sum(axis=-2)
+    n = row_sums.sum(axis=-1)[..., None, None]
+    expected = row_sums[..., :, None] * col_sums[..., None, :] / n
+    rank = np.cumsum((row_sums + col_sums) > 0, axis=-1)
+    weights = (rank[..., :, None] - rank[..., None, :]) ** 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 1 - (weights * confusion).sum(axis=(-2, -1)) / (weights * expected).sum(
+            axis=(-2, -1)
+        )
+
+
+def batched_ordinal_metrics(y_true, y_pred, n_classes):
+    """MAE, Spearman correlation and QWK for several ordinal targets at once.
+
+    `y_true` and `y_pred` are (n_samples, n_targets) arrays of ranks, with
+    NaN where a value is missing; each target is scored on the samples
+    where both are present.
+    """
+    mask = ~np.isnan(y_true) & ~np.isnan(y_pred)
+    n_targets = y_true.shape[1]
+    n = mask.sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mae = np.where(mask, np.abs(y_true - y_pred), 0.0).sum(axis=0) / n
+
+    # Spearman = Pearson correlation on (average) ranks.
+    rank_true = stats.rankdata(
+        np.where(mask, y_true, np.nan), axis=0, nan_policy="omit"
+    )
+    rank_pred = stats.rankdata(
+        np.where(mask, y_pred, np.nan), axis=0, nan_policy="omit"
+    )
+    *_, var_true, var_pred, cov = _masked_moments(rank_true, rank_pred, mask)
+    spearman = _pearson(var_true, var_pred, cov)
+
+    # Confusion matrices of all targets from a single bincount.
+    target = np.broadcast_to(np.arange(n_targets), y_true.shape)[mask]
+    flat_index = (target * n_classes + y_true[mask].astype(int)) * n_classes + y_pred[
+        mask
+    ].astype(int)
+    confusion = np.bincount(flat_index, minlength=n_targets * n_classes**2)
+    qwk = quadratic_weighted_kappa(confusion.reshape(n_targets, n_classes, n_classes))
+    return mae, spearman, qwk
+
+
+def batched_continuous_metrics(y_true, y_pred):
+    """MSE, Pearson correlation and CCC for several targets at once.
+
+    `y_true` and `y_pred` are (n_samples, n_targets) arrays, with NaN
+    where a value is missing; each target is scored on the samples where
+    both are present.
+    """
+    mask = ~np.isnan(y_true) & ~np.isnan(y_pred)
+    n = mask.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mse = np.where(mask, (y_true - y_pred) ** 2, 0.0).sum(axis=0) / n
+    mean_true, mean_pred, var_true, var_pred, cov = _masked_moments(
+        y_true, y_pred, mask
+    )
+    r = _pearson(var_true, var_pred, cov)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ccc = (2 * cov) / (var_true + var_pred + (mean_true - mean_pred) ** 2)
+    return mse, r, ccc
+
+
+def _check_predictions(y_true, y_pred):
+    """Every target must have a (ranked) prediction wherever there is a truth.
+
+    Only donors with a missing or unranked groundtruth are excluded from
+    scoring; a missing or unranked prediction is never masked out.
+    """
+    if np.isnan(y_pred[~np.isnan(y_true)]).any():
+        raise ValueError("Input contains NaN.")
+
+
+def _align(df_adata, df, positions=None):
+    """Groundtruth and prediction rows of the donors with a prediction.
+
+    `positions` holds, for each groundtruth row, the row of its prediction
+    (-1 if none), see `donor_index.check_keys`. Without it, both frames are
+    aligned on their (Donor ID) index.
+    """
+    if positions is None:
+        positions = df.index.get_indexer(df_adata.index)
+    has_pred = positions >= 0
+    return df_adata[has_pred], df.iloc[positions[has_pred]]
+
+
+def goal1_evaluation(df_adata, df, positions=None):
+    targets = TASK1.targets_in(df.columns)
+    truth, pred = _align(df_adata, df, positions)
+    y_true = np.column_stack([t.encode(truth[t.truth_col]) for t in targets])
+    y_pred = np.column_stack([t.encode(pred[t.pred_col]) for t in targets])
+    _check_predictions(y_true, y_pred)
+
+    # MAE, R2, QWK
+    n_classes = max(len(t.labels) for t in targets)
+    mae, r2, qwk = batched_ordinal_metrics(y_true, y_pred, n_classes)
     dict_performance = {}
-    for i in discrete_metrics:
-        dict_discrete = {}
-        count = 0
-        for j in ordinal_regression_order[i]:
-            dict_discrete[j] = count
-            count = count + 1
-        df_adata["num_" + i] = df_adata[i].map(dict_discrete)
-        df["num_predicted " + i] = df["predicted " + i].map(dict_discrete)
-        merged_df = pd.merge(df_adata, df, left_index=True, right_index=True)
-        # MAE, R2, QWK
-        y_true = merged_df["num_" + i].to_numpy()
-        y_pred = merged_df["num_predicted " + i].to_numpy()
-        y_pred = y_pred[~np.isnan(y_true)]
-        y_true = y_true[~np.isnan(y_true)]
-        mae = mean_absolute_error(y_true, y_pred)
-        res = stats.spearmanr(y_true, y_pred)
-        r2 = res.statistic
-        qwk = cohen_kappa_score(y_true, y_pred, weights="quadratic")
-        dict_performance[i + "_MAE"] = mae
-        dict_performance[i + "_R2"] = r2
-        dict_performance[i + "_QWK"] = qwk
+    for k, t in enumerate(targets):
+        dict_performance[t.name + "_MAE"] = mae[k]
+        dict_performance[t.name + "_R2"] = r2[k]
+        dict_performance[t.name + "_QWK"] = qwk[k]
     return dict_performance
 
 
-def goal2_evaluation(df_adata, df):
+def goal2_evaluation(df_adata, df, positions=None):
+    targets = TASK2.targets_in(df.columns)
+    truth, pred = _align(df_adata, df, positions)
+    y_true = truth[[t.truth_col for t in targets]].to_numpy(float)
+    y_pred = pred[[t.pred_col for t in targets]].to_numpy(float)
+    _check_predictions(y_true, y_pred)
+
+    # MSE, R2, CCC
+    mse, r2, ccc = batched_continuous_metrics(y_true, y_pred)
     dict_performance = {}
-    for i in continous_metrics:
-        # MSE, R2, CCC
-        merged_df = pd.merge(df_adata, df, left_index=True, right_index=True)
-        y_true = merged_df["percent " + i + " positive area"].to_numpy()
-        y_pred = merged_df["predicted " + i].to_numpy()
-        y_pred = y_pred[~np.isnan(y_true)]
-        y_true = y_true[~np.isnan(y_true)]
-        mse = mean_squared_error(y_true, y_pred)
-        r2 = np.corrcoef(y_true, y_pred)[0, 1]
-        ccc = concordance_correlation_coefficient(y_true, y_pred)
-        dict_performance[i + "_MSE"] = mse
-        dict_performance[i + "_R2"] = r2
-        dict_performance[i + "_CCC"] = ccc
+    for k, t in enumerate(targets):
+        dict_performance[t.name + "_MSE"] = mse[k]
+        dict_performance[t.name + "_R2"] = r2[k]
+        dict_performance[t.name + "_CCC"] = ccc[k]
     return dict_performance
@@ -0,0 +1,284 @@
+"""Paired permutation tests for head-to-head comparison of submissions.
+
+For a pair of submissions A and B, the test statistic is the difference
+in metric, metric(A) - metric(B). Under the null hypothesis that both
+submissions perform equally, the predictions of A and B for any donor
+are exchangeable, so the null distribution is obtained by swapping A's
+and B's predictions for a random subset of donors (a sign-flip on the
+per-donor contributions).
+
+Rather than re-scoring every permuted submission, all pairs are tested
+at once: with F the (n_permutations, n_donors) swap indicator matrix,
+the permuted confusion matrices (QWK) or moment sums (CCC) of every
+submission are updated with a single matrix product, e.g.
+
+    confusion(A') = confusion(A) - F @ onehot(A) + F @ onehot(B)
+
+The same swaps are used for every pair. P-values are two-sided and are
+corrected for multiple testing across all pairs.
+
+Usage:
+
+    from permutation_test import compare_submissions
+    from task_registry import TARGET_SPECS
+
+    results = compare_submissions(
+        truth=truth["ADNC"],       # indexed by Donor ID
+        predictions=predictions,   # donors x submissions
+        target=TARGET_SPECS["ADNC"],
+    )
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from dream_evaluation import quadratic_weighted_kappa
+from task_registry import Target
+
+METRICS = ("qwk", "ccc")
+
+
+def adjust_pvalues(p_values: np.ndarray, method: str = "holm") -> np.ndarray:
+    """Correct p-values for multiple testing.
+
+    Supported methods are "holm" (family-wise error rate),
+    "fdr_bh" (Benjamini-Hochberg false discovery rate) and
+    "bonferroni". NaN p-values are left as NaN and not counted as tests.
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    result = np.full(p_values.shape, np.nan)
+    tested = ~np.isnan(p_values)
+    p_values = p_values[tested]
+    n = p_values.size
+    if method == "bonferroni":
+        result[tested] = np.minimum(p_values * n, 1)
+        return result
+    order = np.argsort(p_values)
+    sorted_p = p_values[order]
+    if method == "holm":
+        adjusted = np.maximum.accumulate(sorted_p * (n - np.arange(n)))
+    elif method == "fdr_bh":
+        adjusted = sorted_p * n / np.arange(1, n + 1)
+        adjusted = np.minimum.accumulate(adjusted[::-1])[::-1]
+    else:
+        raise ValueError(f"Unknown correction method: `{method}`")
+    unsorted = np.empty(n)
+    unsorted[order] = np.minimum(adjusted, 1)
+    result[tested] = unsorted
+    return result
+
+
+def _qwk_statistics(y_true, y_pred, pairs, n_classes):
+    """QWK(A) - QWK(B) for every pair.
+
+    Returns the observed differences, and a function of the swap
+    indicators that returns the differences for each permutation.
+    """
+    n_donors, n_submissions = y_pred.shape
+    # One-hot (truth, prediction) cell of each donor, per submission.
+    cells = np.zeros((n_submissions, n_donors, n_classes * n_classes))
+    cell_index = y_true[None, :] * n_classes + y_pred.T
+    np.put_along_axis(cells, cell_index[..., None], 1, axis=-1)
+
+    confusion = cells.sum(axis=1)  # (n_submissions, n_classes**2)
+    a, b = pairs[:, 0], pairs[:, 1]
+    shape = (len(pairs), -1, n_classes, n_classes)
+    observed = quadratic_weighted_kappa(
+        confusion[a].reshape(len(pairs), n_classes, n_classes)
+    ) - quadratic_weighted_kappa(confusion[b].reshape(len(pairs), n_classes, n_classes))
+
+    def permute(flips):
+        swapped = np.einsum("bn,snk->sbk", flips, cells)  # F @ onehot
+        delta = swapped[b] - swapped[a]  # (n_pairs, n_permutations, n_classes**2)
+        return quadratic_weighted_kappa(
+            (confusion[a][:, None] + delta).reshape(shape)
+        ) - quadratic_weighted_kappa((confusion[b][:, None] - delta).reshape(shape))
+
+    return observed, permute
+
+
+def _ccc_from_sums(n, mean_true, var_true, sum_pred, sum_sq_pred, sum_cross):
+    mean_pred = sum_pred / n
+    var_pred = sum_sq_pred / n - mean_pred**2
+    cov = sum_cross / n - mean_true * mean_pred
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (2 * cov) / (var_true + var_pred + (mean_true - mean_pred) ** 2)
+
+
+def _ccc_statistics(y_true, y_pred, pairs):
+    """CCC(A) - CCC(B) for every pair.
+
+    Returns the observed differences, and a function of the swap
+    indicators that returns the differences for each permutation.
+    """
+    n = len(y_true)
+    mean_true = y_true.mean()
+    var_true = y_true.var()
+    # Per-donor contributions to the moment sums, per submission.
+    moments = np.stack([y_pred, y_pred**2, y_true[:, None] * y_pred])
+    sums = moments.sum(axis=1)  # (3, n_submissions)
+    a, b = pairs[:, 0], pairs[:, 1]
+    observed = _ccc_from_sums(n, mean_true, var_true, *sums[:, a]) - _ccc_from_sums(
+        n, mean_true, var_true, *sums[:, b]
+    )
+
+    def permute(flips):
+        swapped = flips @ moments  # (3, n_permutations, n_submissions)
+        delta = swapped[:, :, b] - swapped[:, :, a]  # (3, n_permutations, n_pairs)
+        permuted = _ccc_from_sums(
+            n, mean_true, var_true, *(sums[:, None, a] + delta)
+        ) - _ccc_from_sums(n, mean_true, var_true, *(sums[:, None, b] - delta))
+        return permuted.T
+
+    return observed, permute
+
+
+def _group_pairs(has_pred, pairs):
+    """Group pairs by the donors on which both submissions have a prediction.
+
+    Yields the pair indices, the donors and the submissions of each group;
+    pairs of submissions without any missing prediction form one group.
+    """
+    joint = has_pred[:, pairs[:, 0]] & has_pred[:, pairs[:, 1]]
+    masks, group_of_pair = np.unique(joint, axis=1, return_inverse=True)
+    for group, donors in enumerate(masks.T):
+        members = np.flatnonzero(group_of_pair.ravel() == group)
+        submissions = np.unique(pairs[members])
+        yield members, donors, submissions
+
+
+def paired_permutation_test(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    metric: str,
+    n_classes: int | None = None,
+    n_permutations: int = 10_000,
+    batch_size: int = 500,
+    seed: int = 2025,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Paired permutation tests between all pairs of submissions.
+
+    Donors without a groundtruth are excluded, as in scoring. Each pair is
+    compared on the donors for which both submissions have a prediction.
+
+    Args:
+        y_true: groundtruth, shape (n_donors,); ranks for ordinal targets,
+            NaN where missing.
+        y_pred: predictions, shape (n_donors, n_submissions); ranks for
+            ordinal targets, NaN where missing.
+        metric: "qwk" (ordinal targets) or "ccc" (continuous targets).
+        n_classes: number of ranks, for "qwk".
+        n_permutations: number of random donor swaps.
+        batch_size: number of permutations evaluated at a time, which
+            bounds memory use.
+        seed: seed for the random swaps.
+
+    Returns:
+        pairs (n_pairs, 2) of submission column indices, the observed
+        differences in metric and the two-sided p-values (NaN where the
+        difference cannot be calculated).
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: `{metric}`")
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+    keep = ~np.isnan(y_true)
+    y_true, y_pred = y_true[keep], y_pred[keep]
+    has_pred = ~np.isnan(y_pred)
+    if metric == "qwk":
+        n_classes = n_classes or int(max(y_true.max(), np.nanmax(y_pred))) + 1
+        y_true, y_pred = y_true.astype(int), np.where(has_pred, y_pred, 0).astype(int)
+
+    pairs = np.array(list(combinations(range(y_pred.shape[1]), 2)), dtype=int)
+    pairs = pairs.reshape(-1, 2)
+    observed = np.empty(len(pairs))
+    groups = []
+    for members, donors, submissions in _group_pairs(has_pred, pairs):
+        group_pairs = np.searchsorted(submissions, pairs[members])
+        group_true, group_pred = y_true[donors], y_pred[np.ix_(donors, submissions)]
+        if metric == "qwk":
+            observed[members], permute = _qwk_statistics(
+                group_true, group_pred, group_pairs, n_classes
+            )
+        else:
+            observed[members], permute = _ccc_statistics(
+                group_true, group_pred, group_pairs
+            )
+        groups.append((members, donors, permute))
+
+    # Tolerance guards against float noise for permutations that
+    # reproduce the observed split.
+    threshold = np.abs(observed) - 1e-12 * np.maximum(1, np.abs(observed))
+    rng = np.random.default_rng(seed)
+    n_extreme = np.zeros(len(pairs))
+    for start in range(0, n_permutations, batch_size):
+        size = min(batch_size, n_permutations - start)
+        # The same swaps are used for every pair.
+        flips = rng.integers(0, 2, size=(size, len(y_true))).astype(float)
+        for members, donors, permute in groups:
+            extreme = np.abs(permute(flips[:, donors])) >= threshold[members, None]
+            n_extreme[members] += extreme.sum(axis=1)
+    p_values = (n_extreme + 1) / (n_permutations + 1)
+    p_values[np.isnan(observed)] = np.nan
+    return pairs, observed, p_values
+
+
+def compare_submissions(
+    truth: pd.Series,
+    predictions: pd.DataFrame,
+    target: Target,
+    correction: str = "holm",
+    **kwargs,
+) -> pd.DataFrame:
+    """Head-to-head permutation tests between all submissions for a target.
+
+    Donors a submission did not predict (NaN, or absent from `predictions`)
+    are missing: each pair is compared on the donors both submissions have
+    predicted, so pairs with partial predictions are compared on a reduced
+    donor set. Predicted labels without a rank (e.g. "Unclassifiable") are
+    invalid, as in scoring, and raise a ValueError.
+
+    Args:
+        truth: groundtruth labels/values, indexed by donor.
+        predictions: predicted labels/values, one column per submission,
+            indexed by donor.
+        target: target specification (see task_registry.py); ordinal
+            targets are compared on QWK, continuous targets on CCC.
+        correction: multiple-testing correction (see `adjust_pvalues`).
+        **kwargs: passed on to `paired_permutation_test`.
+
+    Returns:
+        One row per pair of submissions, with the observed difference in
+        metric (submission_a - submission_b) and raw and adjusted p-values.
+    """
+    predictions = predictions.reindex(truth.index)
+    y_true = target.encode(truth)
+    y_pred = np.column_stack([target.encode(predictions[col]) for col in predictions])
+    # Encoded as NaN, like missing predictions; reject rather than drop them.
+    unranked = (
+        np.isnan(y_pred) & predictions.notna().to_numpy() & ~np.isnan(y_true)[:, None]
+    )
+    if unranked.any():
+        raise ValueError(
+            "Predictions with unranked or unknown labels: "
+            + ", ".join(map(str, predictions.columns[unranked.any(axis=0)]))
+        )
+    if target.is_ordinal:
+        kwargs.setdefault("n_classes", len(target.labels))
+    pairs, observed, p_values = paired_permutation_test(
+        y_true,
+        y_pred,
+        metric="qwk" if target.is_ordinal else "ccc",
+        **kwargs,
+    )
+    names = np.asarray(predictions.columns)
+    return pd.DataFrame(
+        {
+            "submission_a": names[pairs[:, 0]],
+            "submission_b": names[pairs[:, 1]],
+            "metric": f"{target.name}_{'QWK' if target.is_ordinal else 'CCC'}",
+            "difference": observed,
+            "p_value": p_values,
+            "p_adjusted": adjust_pvalues(p_values, method=correction),
+        }
+    )
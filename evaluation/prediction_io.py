@@ -0,0 +1,64 @@
+"""Reading prediction files.
+
+Besides `predictions.csv`, containers may write their predictions as
+`predictions.parquet` or as an Arrow IPC (Feather v2) file,
+`predictions.arrow`. Binary files are memory-mapped and only the needed
+columns are read, so floats are never round-tripped through text.
+"""
+import os
+from collections.abc import Iterable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+
+
+def _read_arrow_ipc(pred_file: str, usecols: set[str]) -> pa.Table:
+    """Memory-map an Arrow IPC file (or stream) and select `usecols`."""
+    with pa.memory_map(pred_file, "r") as source:
+        try:
+            reader = pa.ipc.open_file(source)
+        except pa.ArrowInvalid:
+            source.seek(0)
+            reader = pa.ipc.open_stream(source)
+        table = reader.read_all()
+    return table.select([name for name in table.column_names if name in usecols])
+
+
+def _to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Convert to pandas, decoding dictionary (categorical) columns first."""
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(
+                i, field.name, pc.cast(table.column(i), field.type.value_type)
+            )
+    return table.to_pandas()
+
+
+def read_predictions(pred_file: str, usecols: Iterable[str]) -> pd.DataFrame:
+    """Read the columns in `usecols` (that are present) from predictions.
+
+    The format is determined by the file extension; anything that is not
+    Parquet or Arrow IPC is read as CSV.
+    """
+    usecols = set(usecols)
+    extension = os.path.splitext(pred_file)[1].lower()
+    if extension in PARQUET_EXTENSIONS:
+        schema = pq.read_schema(pred_file, memory_map=True)
+        table = pq.read_table(
+            pred_file,
+            columns=[name for name in schema.names if name in usecols],
+            memory_map=True,
+        )
+        return _to_pandas(table)
+    if extension in ARROW_EXTENSIONS:
+        return _to_pandas(_read_arrow_ipc(pred_file, usecols))
+    return pd.read_csv(
+        pred_file,
+        usecols=lambda colname: colname in usecols,
+        float_precision="round_trip",
+    )
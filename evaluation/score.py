@@ -5,8 +5,8 @@ Script is currently designed for evaluating submissions for a
 single-task challenge.
 
 At a minimum, you will need to:
-    1. Define the expected data structures (see GROUNDTRUTH_COLS and
-       PREDICTION_COLS)
+    1. Define the expected data structures (see TARGETS and TASKS in
+       task_registry.py)
     2. Customize score_task1() to fit your specific scoring needs
     3. Add helper functions and manage dependencies as needed for your
        scoring process
@@ -16,53 +16,41 @@ functions and update the `score()` function to route evaluation to
 the appropriate task.
 """
 import json
+import os
+from functools import lru_cache
 
 import pandas as pd
 import typer
+from donor_index import build_index, check_keys
 from dream_evaluation import goal1_evaluation, goal2_evaluation
+from prediction_io import read_predictions
+from task_registry import GROUNDTRUTH_COLS, ID_COL, TASK_BY_NUMBER, TASK_SPECS
 from typing_extensions import Annotated
 
-# Groundtruth columns and data type.
-GROUNDTRUTH_COLS = {
-    "Donor ID": str,
-    "Thal": str,
-    "Braak": str,
-    "CERAD": str,
-    "ADNC": str,
-    "LATE": str,
-    "Highest Lewy Body Disease": str,
-    "Cognitive Status": str,
-    "percent 6e10 positive area": float,
-    "percent AT8 positive area": float,
-    "percent NeuN positive area": float,
-    "percent GFAP positive area": float,
-    "percent aSyn positive area": float,
-    "percent pTDP43 positive area": float,
-}
+TASK1 = TASK_SPECS["task1"]
+TASK2 = TASK_SPECS["task2"]
+
+
+@lru_cache(maxsize=8)
+def _read_groundtruth(gt_file: str, mtime: float) -> pd.DataFrame:
+    """Read and index the groundtruth file.
+
+    `mtime` is only used as part of the cache key, so that a long-lived
+    process (see `service.py`) picks up a groundtruth file that has been
+    replaced on disk.
+    """
+    truth = pd.read_csv(
+        gt_file,
+        usecols=GROUNDTRUTH_COLS,
+        dtype=GROUNDTRUTH_COLS,
+    ).set_index(ID_COL)
+    truth.index = build_index(truth.index)
+    return truth
 
-# Expected columns and data types for predictions file.
-TASK1_PRED_COLS = {
-    "Donor ID": str,
-    "predicted ADNC": str,
-    "predicted Braak": str,
-    "predicted CERAD": str,
-    "predicted Thal": str,
-}
-TASK2_PRED_COLS = {
-    "Donor ID": str,
-    "predicted 6e10": float,
-    "predicted AT8": float,
-    "predicted GFAP": float,
-    "predicted NeuN": float,
-}
-OPTIONAL_COLS = {
-    "predicted LATE": str,
-    "predicted Lewy": str,
-    "predicted aSyn": float,
-    "predicted pTDP43": float,
-}
 
-ID_COL = "Donor ID"
+def load_groundtruth(gt_file: str) -> pd.DataFrame:
+    """Return a copy of the (cached) groundtruth dataframe."""
+    return _read_groundtruth(gt_file, os.path.getmtime(gt_file)).copy()
 
 
 def score_task1(gt_file: str, pred_file: str) -> dict[str, int | float]:
@@ -73,23 +61,12 @@ def score_task1(gt_file: str, pred_file: str) -> dict[str, int | float]:
         - MAE (Mean Absolute Error)
         - Spearman rank correlation
     """
-    truth = (
-        pd.read_csv(
-            gt_file,
-            usecols=GROUNDTRUTH_COLS,
-            dtype=GROUNDTRUTH_COLS,
-        )
-        .set_index(ID_COL)
-    )
-    cols_to_use = [*TASK1_PRED_COLS] + [*OPTIONAL_COLS]
-    pred = pd.read_csv(
-        pred_file,
-        usecols=lambda colname: colname in cols_to_use,
-        float_precision="round_trip",
-    ).set_index(ID_COL)
+    truth = load_groundtruth(gt_file)
+    pred = read_predictions(pred_file, usecols=TASK1.usecols)
     return goal1_evaluation(
         df_adata=truth,
         df=pred,
+        positions=check_keys(truth.index, pred[ID_COL]).positions,
     )
 
 
@@ -101,47 +78,66 @@ def score_task2(gt_file: str, pred_file: str) -> dict[str, int | float]:
         - MSE (Mean Squared Error)
         - R2 (Coefficient of Determination)
     """
-    truth = (
-        pd.read_csv(
-            gt_file,
-            usecols=GROUNDTRUTH_COLS,
-            dtype=GROUNDTRUTH_COLS,
-        )
-        .set_index(ID_COL)
-        .fillna(0)  # TODO: check with Allen folks about NeuN gt
-    )
-    cols_to_use = [*TASK2_PRED_COLS] + [*OPTIONAL_COLS]
-    pred = pd.read_csv(
-        pred_file,
-        usecols=lambda colname: colname in cols_to_use,
-        float_precision="round_trip",
-    ).set_index(ID_COL)
+    truth = load_groundtruth(gt_file)
+    truth = truth.fillna(0)  # TODO: check with Allen folks about NeuN gt
+    pred = read_predictions(pred_file, usecols=TASK2.usecols)
     return goal2_evaluation(
         df_adata=truth,
         df=pred,
+        positions=check_keys(truth.index, pred[ID_COL]).positions,
     )
 
 
+# Scoring function of each challenge task number.
+SCORING_FUNCS = {
+    task_number: {"task1": score_task1, "task2": score_task2}[task.name]
+    for task_number, task in TASK_BY_NUMBER.items()
+}
+
+
 def score(task_number: int, gt_file: str, pred_file: str) -> dict[str, int | float]:
     """
     Routes evaluation to the appropriate task-specific function.
     """
-    scoring_func = {
-        9616048: score_task1,
-        9616135: score_task1,
-        9616049: score_task2,
-        9616136: score_task2,
-        9617459: score_task1,
-        9617461: score_task1,
-        9617460: score_task2,
-        9617463: score_task2,
-    }.get(task_number)
-
+    scoring_func = SCORING_FUNCS.get(task_number)
     if scoring_func:
         return scoring_func(gt_file=gt_file, pred_file=pred_file)
     raise KeyError
 
 
+def get_results(task_number: int, gt_file: str, pred_file: str) -> dict:
+    """
+    Scores predictions against the groundtruth and returns the contents
+    of the results JSON file (scoring status and metrics).
+    """
+    scores = {}
+    status = "INVALID"
+    try:
+        scores = score(
+            task_number=task_number,
+            gt_file=gt_file,
+            pred_file=pred_file,
+        )
+        status = "SCORED"
+        errors = ""
+    except ValueError:
+        errors = "Error encountered during scoring; submission not evaluated."
+    except KeyError:
+        errors = f"Invalid challenge task number specified: `{task_number}`"
+
+    # Handle edge-case when MSE or R^2 cannot be calculated and returns `nan`.
+    scores = {
+        metric: ("Cannot be calculated" if pd.isnull(score) else score)
+        for metric, score in scores.items()
+    }
+
+    return {
+        "submission_status": status,
+        "submission_errors": errors,
+        **scores,
+    }
+
+
 def main(
     predictions_file: Annotated[
         str,
@@ -180,35 +176,14 @@ def main(
     Scores predictions against the groundtruth and updates the results
     JSON file with scoring status and metrics.
     """
-    scores = {}
-    status = "INVALID"
-    try:
-        scores = score(
-            task_number=task_number,
-            gt_file=groundtruth_file,
-            pred_file=predictions_file,
-        )
-        status = "SCORED"
-        errors = ""
-    except ValueError:
-        errors = "Error encountered during scoring; submission not evaluated."
-    except KeyError:
-        errors = f"Invalid challenge task number specified: `{task_number}`"
-
-    # Handle edge-case when MSE or R^2 cannot be calculated and returns `nan`.
-    scores = {
-        metric: ("Cannot be calculated" if pd.isnull(score) else score)
-        for metric, score in scores.items()
-    }
-
-    res = {
-        "submission_status": status,
-        "submission_errors": errors,
-        **scores,
-    }
+    res = get_results(
+        task_number=task_number,
+        gt_file=groundtruth_file,
+        pred_file=predictions_file,
+    )
     with open(output_file, "w", encoding="utf-8") as out:
         out.write(json.dumps(res))
-    print(status)
+    print(res["submission_status"])
 
 
 if __name__ == "__main__":
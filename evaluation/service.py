@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""Resident validation and scoring service.
+
+Running `validate.py` or `score.py` as a CLI cold-starts a Python
+interpreter, re-imports pandas/scipy/scikit-learn and re-reads the
+groundtruth for every submission, which dominates the runtime for small
+prediction files. This script instead keeps a pool of warm worker
+processes (libraries imported, groundtruth parsed) listening on a Unix
+socket:
+
+    python service.py -g PATH/TO/GROUNDTRUTH.CSV [-g ...] [-w WORKERS]
+
+Requests are sent with the thin `client.py` CLI, which takes the same
+`-p/-g/-t/-o` options and writes the same results JSON file as
+`validate.py` and `score.py`, e.g.
+
+    python client.py score -p PREDICTIONS.CSV -g GROUNDTRUTH.CSV -t 9616049
+
+When no service is running, the client falls back to validating/scoring
+in-process.
+
+Protocol: one JSON object per connection, terminated by a newline, with
+the keys `command` ("validate" or "score"), `task_number`, `gt_file` and
+`pred_file`. The service replies with a single JSON line holding either
+`results` (the results JSON contents) or `error`.
+"""
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import typer
+from typing_extensions import Annotated
+
+DEFAULT_SOCKET = "/tmp/sea-ad-dream-eval.sock"
+SOCKET_ENV_VAR = "SEA_AD_EVAL_SOCKET"
+COMMANDS = ("validate", "score")
+
+
+def get_socket_path() -> str:
+    """Socket path, overridable with the SEA_AD_EVAL_SOCKET env variable."""
+    return os.environ.get(SOCKET_ENV_VAR, DEFAULT_SOCKET)
+
+
+class ServiceError(Exception):
+    """The service was reached but failed to handle the request."""
+
+
+def request_results(
+    command: str,
+    task_number: int,
+    gt_file: str,
+    pred_file: str,
+    socket_path: str | None = None,
+) -> dict | None:
+    """Send a validate/score request to the running service.
+
+    Returns the results JSON contents, or None if no service is reachable,
+    in which case the caller should run the request in-process. Raises
+    ServiceError if the service failed to handle the request; running it
+    again in-process would fail the same way.
+    """
+    socket_path = socket_path or get_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+    request = {
+        "command": command,
+        "task_number": task_number,
+        # Service may be running from a different working directory.
+        "gt_file": os.path.abspath(gt_file),
+        "pred_file": os.path.abspath(pred_file),
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5)
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            # Stale socket file, e.g. left behind by a killed service.
+            return None
+        sock.settimeout(None)
+        try:
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                response = json.loads(reader.readline())
+        except (OSError, ValueError) as err:
+            raise ServiceError(f"No valid response from the service: {err}")
+    if "error" in response:
+        raise ServiceError(response["error"])
+    return response["results"]
+
+
+def _init_worker(gt_files: list[str]) -> None:
+    """Import the evaluation modules and pre-load the groundtruth files."""
+    for command in COMMANDS:
+        module = importlib.import_module(command)
+        for gt_file in gt_files:
+            module.load_groundtruth(gt_file)
+
+
+def _run_request(command: str, task_number: int, gt_file: str, pred_file: str):
+    """Validate/score a single submission in a worker process."""
+    module = importlib.import_module(command)
+    return module.get_results(
+        task_number=task_number,
+        gt_file=gt_file,
+        pred_file=pred_file,
+    )
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Forward each request to the worker pool and reply with its results."""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            if request.get("command") not in COMMANDS:
+                raise ValueError(f"Unknown command: {request.get('command')}")
+            future = self.server.executor.submit(
+                _run_request,
+                command=request["command"],
+                task_number=int(request["task_number"]),
+                gt_file=request["gt_file"],
+                pred_file=request["pred_file"],
+            )
+            response = {"results": future.result()}
+        except Exception as err:
+            response = {"error": f"{type(err).__name__}: {err}"}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class EvaluationServer(socketserver.ThreadingUnixStreamServer):
+    """Unix socket server backed by a pool of warm worker processes."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, executor: ProcessPoolExecutor):
+        self.executor = executor
+        super().__init__(socket_path, _RequestHandler)
+
+
+def serve(
+    socket_path: str,
+    gt_files: list[str],
+    workers: int | None = None,
+) -> None:
+    """Start the service and block until interrupted."""
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    gt_files = [os.path.abspath(gt_file) for gt_file in gt_files]
+    # Shut down cleanly (and remove the socket) when stopped by a supervisor.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(gt_files,),
+    ) as executor:
+        # Start the workers (and run their initializer) before accepting
+        # requests, rather than on the first submission.
+        executor.submit(os.getpid).result()
+        with EvaluationServer(socket_path, executor) as server:
+            print(f"Listening on {socket_path}...")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os.remove(socket_path)
+
+
+def main(
+    groundtruth_file: Annotated[
+        list[str],
+        typer.Option(
+            "-g",
+            "--groundtruth_file",
+            help="Path to a groundtruth file to pre-load (can be repeated).",
+        ),
+    ] = [],
+    socket_path: Annotated[
+        str,
+        typer.Option(
+            "-s",
+            "--socket_path",
+            help=f"Path to the Unix socket. Defaults to ${SOCKET_ENV_VAR} "
+            f"or {DEFAULT_SOCKET}.",
+        ),
+    ] = "",
+    workers: Annotated[
+        int,
+        typer.Option(
+            "-w",
+            "--workers",
+            help="Number of worker processes. Defaults to the number of CPUs.",
+        ),
+    ] = 0,
+):
+    """Runs the resident validation and scoring service."""
+    serve(
+        socket_path=socket_path or get_socket_path(),
+        gt_files=groundtruth_file,
+        workers=workers or None,
+    )
+
+
+if __name__ == "__main__":
+    # Prevent replacing underscore with dashes in CLI names.
+    typer.main.get_command_name = lambda name: name
+    typer.run(main)
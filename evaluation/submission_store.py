@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""Columnar store of all submissions' predictions, for post-challenge analyses.
+
+Reads a directory of team prediction files in parallel, aligns each one
+by `Donor ID` against the groundtruth once, and saves one donors x
+submissions matrix per target as a `.npy` file that can be memory-mapped:
+int8 ranks for ordinal targets (-1 where missing, or for an unranked
+groundtruth) and float64 for continuous targets (NaN where missing). Bootstrapping,
+ranking and method comparisons can then read every submission's
+predictions for a target with a single (memory-mapped) array load.
+
+Layout of the store directory:
+
+    manifest.json          donors, submissions and target specs
+    truth/<target>.npy     groundtruth, shape (n_donors,)
+    predictions/<target>.npy
+                           predictions, shape (n_donors, n_submissions)
+
+Build a store with:
+
+    python submission_store.py -d PATH/TO/SUBMISSIONS -g PATH/TO/GROUNDTRUTH.CSV \
+        -o PATH/TO/STORE [-w WORKERS]
+
+where the submissions directory holds either one prediction file per
+team (named after the team) or one sub-directory per team containing a
+`predictions.{csv,parquet,arrow}` file.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import typer
+from prediction_io import ARROW_EXTENSIONS, PARQUET_EXTENSIONS, read_predictions
+from task_registry import GROUNDTRUTH_COLS, ID_COL, TARGET_SPECS, Target
+from typing_extensions import Annotated
+
+PREDICTION_EXTENSIONS = (".csv", *PARQUET_EXTENSIONS, *ARROW_EXTENSIONS)
+MISSING_CODE = -1
+
+
+def _is_prediction_file(path: str) -> bool:
+    return os.path.isfile(path) and path.lower().endswith(PREDICTION_EXTENSIONS)
+
+
+def find_submissions(pred_dir: str) -> dict[str, str]:
+    """Map submission names to prediction files found in `pred_dir`."""
+    submissions = {}
+    for entry in sorted(os.listdir(pred_dir)):
+        path = os.path.join(pred_dir, entry)
+        if _is_prediction_file(path):
+            submissions[os.path.splitext(entry)[0]] = path
+        elif os.path.isdir(path):
+            pred_files = [
+                os.path.join(path, filename)
+                for filename in sorted(os.listdir(path))
+                if filename.startswith("predictions")
+                and _is_prediction_file(os.path.join(path, filename))
+            ]
+            if pred_files:
+                submissions[entry] = pred_files[0]
+    return submissions
+
+
+def _dtype(target: Target) -> np.dtype:
+    return np.dtype(np.int8 if target.is_ordinal else np.float64)
+
+
+def _to_store_values(target: Target, values: pd.Series) -> np.ndarray:
+    """Encode labels/values into the target's storage dtype."""
+    encoded = target.encode(values)
+    if target.is_ordinal:
+        encoded = np.where(np.isnan(encoded), MISSING_CODE, encoded)
+    return encoded.astype(_dtype(target))
+
+
+def _read_submission(
+    pred_file: str, truth_index: pd.Index, usecols: list[str]
+) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+    """Read, align and encode one submission.
+
+    Returns the groundtruth rows of the predicted donors and, per target
+    present in the file, the encoded predictions for these rows. Labels
+    without a rank (e.g. "Unclassifiable") are invalid, as in scoring:
+    they raise a ValueError rather than being stored as missing.
+    """
+    pred = read_predictions(pred_file, usecols=usecols)
+    if ID_COL not in pred.columns:
+        raise ValueError(f"Missing the '{ID_COL}' column.")
+    pred = pred.drop_duplicates(ID_COL).set_index(ID_COL)
+    rows = truth_index.get_indexer(pred.index)
+    known = rows >= 0
+    pred = pred[known]
+    encoded = {}
+    for name, target in TARGET_SPECS.items():
+        if target.pred_col not in pred.columns:
+            continue
+        values = pred[target.pred_col]
+        if target.is_ordinal:
+            invalid = values.notna() & ~values.isin(target.accepted_labels)
+            if invalid.any():
+                raise ValueError(
+                    f"Found {invalid.sum()} unranked or unknown label(s) "
+                    f"in column '{target.pred_col}'."
+                )
+        encoded[name] = _to_store_values(target, values)
+    return rows[known], encoded
+
+
+def build_store(
+    pred_dir: str,
+    gt_file: str,
+    store_dir: str,
+    workers: int | None = None,
+) -> dict:
+    """Read all submissions in `pred_dir` into a store at `store_dir`.
+
+    Submissions that cannot be read, or that predict labels without a
+    rank, are left out of the store, and are listed, with the error,
+    under "failed_submissions" in the manifest.
+    As in task 2 scoring, missing continuous groundtruth values are
+    stored as 0. Returns the store manifest.
+    """
+    truth = pd.read_csv(
+        gt_file,
+        usecols=GROUNDTRUTH_COLS,
+        dtype=GROUNDTRUTH_COLS,
+    ).set_index(ID_COL)
+    submissions = find_submissions(pred_dir)
+    usecols = [ID_COL] + [target.pred_col for target in TARGET_SPECS.values()]
+
+    # Files are read, aligned and encoded in parallel; the encoded
+    # predictions are small (one value per donor and target).
+    read, failed = {}, {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_read_submission, pred_file, truth.index, usecols): name
+            for name, pred_file in submissions.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                read[name] = future.result()
+            except Exception as err:
+                failed[name] = f"{type(err).__name__}: {err}"
+    names = [name for name in submissions if name in read]
+
+    os.makedirs(os.path.join(store_dir, "truth"), exist_ok=True)
+    os.makedirs(os.path.join(store_dir, "predictions"), exist_ok=True)
+    for name, target in TARGET_SPECS.items():
+        values = truth[target.truth_col]
+        if not target.is_ordinal:
+            values = values.fillna(0)  # TODO: check with Allen folks about NeuN gt
+        np.save(
+            os.path.join(store_dir, "truth", f"{name}.npy"),
+            _to_store_values(target, values),
+        )
+        matrix = np.lib.format.open_memmap(
+            os.path.join(store_dir, "predictions", f"{name}.npy"),
+            mode="w+",
+            dtype=_dtype(target),
+            shape=(len(truth), len(names)),
+        )
+        matrix[:] = MISSING_CODE if target.is_ordinal else np.nan
+        for i, submission in enumerate(names):
+            rows, encoded = read[submission]
+            if name in encoded:
+                matrix[rows, i] = encoded[name]
+        matrix.flush()
+        del matrix
+
+    manifest = {
+        "donors": truth.index.tolist(),
+        "submissions": names,
+        "failed_submissions": failed,
+        "targets": {
+            name: {
+                "kind": target.kind,
+                "dtype": _dtype(target).name,
+                "labels": list(target.labels),
+            }
+            for name, target in TARGET_SPECS.items()
+        },
+    }
+    with open(os.path.join(store_dir, "manifest.json"), "w", encoding="utf-8") as out:
+        out.write(json.dumps(manifest))
+    return manifest
+
+
+class SubmissionStore:
+    """Read access to a store created by `build_store`."""
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, "manifest.json"), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.donors = pd.Index(self.manifest["donors"], name=ID_COL)
+        self.submissions = pd.Index(self.manifest["submissions"])
+
+    def truth(self, target: str) -> np.ndarray:
+        """Groundtruth ranks/values, shape (n_donors,)."""
+        return np.load(os.path.join(self.store_dir, "truth", f"{target}.npy"))
+
+    def predictions(self, target: str, mmap_mode: str | None = "r") -> np.ndarray:
+        """Stored predictions, shape (n_donors, n_submissions).
+
+        Ordinal targets are int8 ranks with -1 where missing; continuous
+        targets are floats with NaN where missing.
+        """
+        return np.load(
+            os.path.join(self.store_dir, "predictions", f"{target}.npy"),
+            mmap_mode=mmap_mode,
+        )
+
+    def complete_submissions(self, target: str) -> pd.Index:
+        """Submissions with a prediction for every donor with a groundtruth."""
+        truth, pred = self.values(target)
+        has_truth = ~np.isnan(truth)
+        return self.submissions[~np.isnan(pred[has_truth]).any(axis=0)]
+
+    def values(
+        self, target: str, submissions: list[str] | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Groundtruth and predictions as floats, with NaN where missing.
+
+        Predictions are restricted to `submissions`, if given (e.g.
+        `complete_submissions(target)`). This is the input expected by
+        e.g. `permutation_test.paired_permutation_test`, which compares
+        each pair of submissions on the donors both have predicted.
+        """
+        truth = self.truth(target).astype(float)
+        pred = self.predictions(target)
+        if submissions is not None:
+            pred = pred[:, self.submissions.get_indexer(submissions)]
+        pred = np.asarray(pred, dtype=float)
+        if self.manifest["targets"][target]["kind"] == "ordinal":
+            truth[truth == MISSING_CODE] = np.nan
+            pred[pred == MISSING_CODE] = np.nan
+        return truth, pred
+
+    def frame(self, target: str, submissions: list[str] | None = None) -> pd.DataFrame:
+        """Predictions as a donors x submissions dataframe of ranks/values."""
+        _, pred = self.values(target, submissions)
+        columns = self.submissions if submissions is None else pd.Index(submissions)
+        return pd.DataFrame(pred, index=self.donors, columns=columns)
+
+
+def main(
+    predictions_dir: Annotated[
+        str,
+        typer.Option(
+            "-d",
+            "--predictions_dir",
+            help="Path to the directory of submissions.",
+        ),
+    ],
+    groundtruth_file: Annotated[
+        str,
+        typer.Option(
+            "-g",
+            "--groundtruth_file",
+            help="Path to the groundtruth file.",
+        ),
+    ],
+    store_dir: Annotated[
+        str,
+        typer.Option(
+            "-o",
+            "--store_dir",
+            help="Path to the directory in which to save the store.",
+        ),
+    ] = "submission_store",
+    workers: Annotated[
+        int,
+        typer.Option(
+            "-w",
+            "--workers",
+            help="Number of files to read in parallel. Defaults to the number of CPUs.",
+        ),
+    ] = 0,
+):
+    """Builds a columnar store of all submissions' predictions."""
+    manifest = build_store(
+        pred_dir=predictions_dir,
+        gt_file=groundtruth_file,
+        store_dir=store_dir,
+        workers=workers or os.cpu_count(),
+    )
+    print(
+        f"Stored {len(manifest['submissions'])} submission(s) for "
+        f"{len(manifest['donors'])} donor(s) in {store_dir}."
+    )
+    for name, error in manifest["failed_submissions"].items():
+        print(f"Unable to read submission `{name}`: {error}")
+
+
+if __name__ == "__main__":
+    # Prevent replacing underscore with dashes in CLI names.
+    typer.main.get_command_name = lambda name: name
+    typer.run(main)
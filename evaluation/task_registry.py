@@ -0,0 +1,231 @@
+"""Challenge task registry.
+
+Single source of truth for the challenge tasks: which Synapse task
+numbers route to which task, the columns and data types expected in the
+groundtruth and predictions files, and the vocabularies and value ranges
+of every target. It is shared by `validate.py`, `score.py`,
+`dream_evaluation.py` and the dummy model.
+
+The declarations in TARGETS and TASKS are compiled once, at import, into
+`Target` and `Task` objects holding ready-to-use dtype maps, column
+projections and label -> rank lookup arrays.
+"""
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+ID_COL = "Donor ID"
+
+# Target declarations. Ordinal targets list their labels in rank order;
+# `aliases` are accepted labels sharing the rank of another label, and
+# `unranked` are groundtruth labels without a rank (donors with these
+# labels are excluded from scoring). Unranked labels are not accepted as
+# predictions, so that a submission cannot choose which donors it is
+# scored on.
+TARGETS = {
+    "ADNC": {
+        "kind": "ordinal",
+        "labels": ["Not AD", "Low", "Intermediate", "High"],
+    },
+    "Braak": {
+        "kind": "ordinal",
+        "labels": [
+            "Braak 0",
+            "Braak I",
+            "Braak II",
+            "Braak III",
+            "Braak IV",
+            "Braak V",
+            "Braak VI",
+        ],
+    },
+    "CERAD": {
+        "kind": "ordinal",
+        "labels": ["Absent", "Sparse", "Moderate", "Frequent"],
+    },
+    "Thal": {
+        "kind": "ordinal",
+        "labels": ["Thal 0", "Thal 1", "Thal 2", "Thal 3", "Thal 4", "Thal 5"],
+    },
+    "LATE": {
+        "kind": "ordinal",
+        "labels": ["Not Identified", "LATE Stage 1", "LATE Stage 2", "LATE Stage 3"],
+        "unranked": ["Unclassifiable"],  # TODO: check with Allen folks
+    },
+    "Lewy": {
+        "kind": "ordinal",
+        "truth_col": "Highest Lewy Body Disease",
+        "labels": [
+            "Not Identified (olfactory bulb assessed)",
+            "Olfactory bulb only",
+            "Amygdala-predominant",
+            "Brainstem-predominant",
+            "Limbic (Transitional)",
+            "Neocortical (Diffuse)",
+        ],
+        "aliases": {
+            # TODO: check with Allen folks
+            "Not Identified (olfactory bulb not assessed)": (
+                "Not Identified (olfactory bulb assessed)"
+            ),
+        },
+    },
+    "6e10": {"kind": "continuous", "range": (0, 100)},
+    "AT8": {"kind": "continuous", "range": (0, 100)},
+    "NeuN": {"kind": "continuous", "range": (0, 100)},
+    "GFAP": {"kind": "continuous", "range": (0, 100)},
+    "aSyn": {"kind": "continuous", "range": (0, 100)},
+    "pTDP43": {"kind": "continuous", "range": (0, 100)},
+}
+
+# Task declarations. Targets are listed in the order their metrics are
+# reported; optional targets are only validated and scored if present.
+TASKS = {
+    "task1": {
+        "task_numbers": [9616048, 9616135, 9617459, 9617461],
+        "targets": ["Braak", "Thal", "ADNC", "CERAD"],
+        "optional_targets": ["LATE", "Lewy"],
+    },
+    "task2": {
+        "task_numbers": [9616049, 9616136, 9617460, 9617463],
+        "targets": ["6e10", "AT8", "NeuN", "GFAP"],
+        "optional_targets": ["aSyn", "pTDP43"],
+    },
+}
+
+# Groundtruth columns that are read but not scored.
+EXTRA_GROUNDTRUTH_COLS = {"Cognitive Status": str}
+
+
+# Specs are immutable (mappings are read-only proxies, arrays read-only)
+# and compared/hashed by identity, as each is compiled exactly once.
+@dataclass(frozen=True, eq=False)
+class Target:
+    """Compiled target specification."""
+
+    name: str
+    kind: str
+    pred_col: str
+    truth_col: str
+    dtype: type
+    labels: tuple[str, ...] = ()
+    # Labels accepted in predictions: ranked labels and their aliases.
+    accepted_labels: frozenset[str] = frozenset()
+    codes: MappingProxyType[str, int] = field(
+        default_factory=lambda: MappingProxyType({})
+    )
+    value_range: tuple[float, float] | None = None
+    # Categories for pd.Categorical, and the rank of each category (NaN
+    # if unranked) followed by a trailing NaN for unknown labels (code -1).
+    _categories: tuple[str, ...] = ()
+    _lookup: np.ndarray = field(default_factory=lambda: np.array([np.nan]))
+
+    @property
+    def is_ordinal(self) -> bool:
+        return self.kind == "ordinal"
+
+    def encode(self, values: pd.Series) -> np.ndarray:
+        """Labels -> float ranks; NaN for unranked or unknown labels."""
+        if not self.is_ordinal:
+            return values.to_numpy(dtype=float)
+        codes = pd.Categorical(values, categories=self._categories).codes
+        return self._lookup[codes]
+
+
+@dataclass(frozen=True, eq=False)
+class Task:
+    """Compiled task specification."""
+
+    name: str
+    task_numbers: tuple[int, ...]
+    targets: tuple[Target, ...]
+    optional_targets: tuple[Target, ...]
+    pred_cols: MappingProxyType[str, type]
+    optional_cols: MappingProxyType[str, type]
+
+    @property
+    def usecols(self) -> list[str]:
+        """Prediction columns to read: required and optional."""
+        return [*self.pred_cols, *self.optional_cols]
+
+    def targets_in(self, columns) -> list[Target]:
+        """Required targets, followed by the optional ones in `columns`."""
+        return [*self.targets] + [
+            target for target in self.optional_targets if target.pred_col in columns
+        ]
+
+
+def _compile_target(name: str, spec: dict) -> Target:
+    if spec["kind"] == "continuous":
+        return Target(
+            name=name,
+            kind="continuous",
+            pred_col=f"predicted {name}",
+            truth_col=spec.get("truth_col", f"percent {name} positive area"),
+            dtype=float,
+            value_range=spec["range"],
+        )
+    labels = tuple(spec["labels"])
+    codes = {label: rank for rank, label in enumerate(labels)}
+    for alias, label in spec.get("aliases", {}).items():
+        codes[alias] = codes[label]
+    unranked = tuple(spec.get("unranked", ()))
+    categories = (*codes, *unranked)
+    lookup = np.array(
+        [codes[label] for label in codes] + [np.nan] * (len(unranked) + 1),
+        dtype=float,
+    )
+    lookup.flags.writeable = False
+    return Target(
+        name=name,
+        kind="ordinal",
+        pred_col=f"predicted {name}",
+        truth_col=spec.get("truth_col", name),
+        dtype=str,
+        labels=labels,
+        accepted_labels=frozenset(codes),
+        codes=MappingProxyType(codes),
+        _categories=categories,
+        _lookup=lookup,
+    )
+
+
+def _compile_task(name: str, spec: dict) -> Task:
+    targets = tuple(TARGET_SPECS[target] for target in spec["targets"])
+    optional = tuple(TARGET_SPECS[target] for target in spec["optional_targets"])
+    return Task(
+        name=name,
+        task_numbers=tuple(spec["task_numbers"]),
+        targets=targets,
+        optional_targets=optional,
+        pred_cols=MappingProxyType(
+            {
+                ID_COL: str,
+                **{
+                    target.pred_col: target.dtype
+                    for target in sorted(targets, key=lambda target: target.pred_col)
+                },
+            }
+        ),
+        optional_cols=MappingProxyType(
+            {target.pred_col: target.dtype for target in optional}
+        ),
+    )
+
+
+TARGET_SPECS = {name: _compile_target(name, spec) for name, spec in TARGETS.items()}
+TASK_SPECS = {name: _compile_task(name, spec) for name, spec in TASKS.items()}
+TASK_BY_NUMBER = {
+    task_number: task
+    for task in TASK_SPECS.values()
+    for task_number in task.task_numbers
+}
+
+# Groundtruth columns and data type.
+GROUNDTRUTH_COLS = {
+    ID_COL: str,
+    **{target.truth_col: target.dtype for target in TARGET_SPECS.values()},
+    **EXTRA_GROUNDTRUTH_COLS,
+}
@@ -0,0 +1,111 @@
+"""Tests for task 1/2 scoring, validation included."""
+import numpy as np
+import pandas as pd
+import pytest
+import score
+import validate
+from dream_evaluation import (
+    batched_continuous_metrics,
+    batched_ordinal_metrics,
+    concordance_correlation_coefficient,
+    goal1_evaluation,
+)
+from scipy import stats
+from sklearn.metrics import cohen_kappa_score, mean_absolute_error, mean_squared_error
+from task_registry import ID_COL, TARGET_SPECS, TASK_SPECS
+
+TASK1 = TASK_SPECS["task1"]
+TASK1_NUMBER = TASK1.task_numbers[0]
+N_DONORS = 200
+
+
+@pytest.mark.parametrize(
+    "classes",
+    [
+        np.arange(7),
+        # Classes 2, 4 and 6 are in neither truth nor predictions, which
+        # sklearn's QWK skips when computing the weights.
+        np.array([0, 1, 3, 5]),
+    ],
+)
+@pytest.mark.parametrize("seed", range(5))
+def test_batched_ordinal_metrics_match_sklearn(classes, seed):
+    rng = np.random.default_rng(seed)
+    y_true = rng.choice(classes, size=(N_DONORS, 3)).astype(float)
+    y_pred = rng.choice(classes, size=(N_DONORS, 3)).astype(float)
+    y_true[rng.random(y_true.shape) < 0.1] = np.nan
+    y_pred[:, 2] = y_true[:, 2]  # perfect predictions
+
+    mae, spearman, qwk = batched_ordinal_metrics(y_true, y_pred, n_classes=7)
+    for k in range(3):
+        mask = ~np.isnan(y_true[:, k])
+        true, pred = y_true[mask, k].astype(int), y_pred[mask, k].astype(int)
+        assert mae[k] == pytest.approx(mean_absolute_error(true, pred), abs=1e-12)
+        assert spearman[k] == pytest.approx(stats.spearmanr(true, pred)[0], abs=1e-12)
+        assert qwk[k] == pytest.approx(
+            cohen_kappa_score(true, pred, weights="quadratic"), abs=1e-12
+        )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batched_continuous_metrics_match_references(seed):
+    rng = np.random.default_rng(seed)
+    y_true = rng.uniform(0, 100, size=(N_DONORS, 3))
+    y_pred = y_true + rng.normal(0, 20, size=y_true.shape)
+    y_true[rng.random(y_true.shape) < 0.1] = np.nan
+
+    mse, r, ccc = batched_continuous_metrics(y_true, y_pred)
+    for k in range(3):
+        mask = ~np.isnan(y_true[:, k])
+        true, pred = y_true[mask, k], y_pred[mask, k]
+        assert mse[k] == pytest.approx(mean_squared_error(true, pred), rel=1e-12)
+        assert r[k] == pytest.approx(stats.pearsonr(true, pred)[0], abs=1e-12)
+        assert ccc[k] == pytest.approx(
+            concordance_correlation_coefficient(true, pred), abs=1e-12
+        )
+
+
+def test_unranked_prediction_is_invalid(
+    make_groundtruth, make_predictions, write_files
+):
+    truth = make_groundtruth(N_DONORS)
+    pred = make_predictions(truth, TASK1)
+    pred.loc[10:, TARGET_SPECS["LATE"].pred_col] = "Unclassifiable"
+    gt_file, pred_file = write_files(truth, pred)
+
+    res = validate.get_results(TASK1_NUMBER, gt_file, pred_file)
+    assert res["submission_status"] == "INVALID"
+    assert "predicted LATE" in res["submission_errors"]
+
+    res = score.get_results(TASK1_NUMBER, gt_file, pred_file)
+    assert res["submission_status"] == "INVALID"
+    assert "LATE_QWK" not in res
+
+
+def test_unranked_prediction_is_not_masked():
+    truth = pd.DataFrame(
+        {"LATE": ["LATE Stage 1", "LATE Stage 2", "Not Identified"]},
+        index=pd.Index(["a", "b", "c"], name=ID_COL),
+    )
+    for target in TASK1.targets:
+        truth[target.truth_col] = target.labels[0]
+    pred = truth.rename(columns=lambda col: f"predicted {col}")
+    pred["predicted LATE"] = ["LATE Stage 1", "Unclassifiable", "Unclassifiable"]
+    with pytest.raises(ValueError):
+        goal1_evaluation(truth, pred)
+
+
+def test_unranked_truth_is_excluded(make_groundtruth, make_predictions, write_files):
+    truth = make_groundtruth(N_DONORS)
+    pred = make_predictions(truth, TASK1)
+    truth.loc[:9, TARGET_SPECS["LATE"].truth_col] = "Unclassifiable"
+    gt_file, pred_file = write_files(truth, pred)
+
+    assert (
+        validate.get_results(TASK1_NUMBER, gt_file, pred_file)["submission_status"]
+        == "VALIDATED"
+    )
+    res = score.get_results(TASK1_NUMBER, gt_file, pred_file)
+    assert res["submission_status"] == "SCORED"
+    assert res["LATE_MAE"] == 0
+    assert res["LATE_QWK"] == pytest.approx(1)
@@ -0,0 +1,148 @@
+"""Tests for the paired permutation tests, against brute-force recomputation."""
+import numpy as np
+import pandas as pd
+import pytest
+from dream_evaluation import concordance_correlation_coefficient
+from permutation_test import (
+    adjust_pvalues,
+    compare_submissions,
+    paired_permutation_test,
+)
+from sklearn.metrics import cohen_kappa_score
+from task_registry import TARGET_SPECS
+
+N_DONORS = 60
+N_SUBMISSIONS = 4
+N_PERMUTATIONS = 200
+SEED = 7
+
+
+def qwk(y_true, y_pred):
+    return cohen_kappa_score(
+        y_true.astype(int), y_pred.astype(int), weights="quadratic"
+    )
+
+
+def brute_force(y_true, y_pred, metric):
+    """Observed differences and p-values, re-scoring every permutation."""
+    keep = ~np.isnan(y_true)
+    y_true, y_pred = y_true[keep], y_pred[keep]
+    flips = (
+        np.random.default_rng(SEED)
+        .integers(0, 2, size=(N_PERMUTATIONS, len(y_true)))
+        .astype(bool)
+    )
+    observed, p_values = [], []
+    for a in range(y_pred.shape[1]):
+        for b in range(a + 1, y_pred.shape[1]):
+            donors = ~np.isnan(y_pred[:, a]) & ~np.isnan(y_pred[:, b])
+            true, pred_a, pred_b = y_true[donors], y_pred[donors, a], y_pred[donors, b]
+            diff = metric(true, pred_a) - metric(true, pred_b)
+            n_extreme = 0
+            for flip in flips[:, donors]:
+                perm_a = np.where(flip, pred_b, pred_a)
+                perm_b = np.where(flip, pred_a, pred_b)
+                permuted = metric(true, perm_a) - metric(true, perm_b)
+                n_extreme += abs(permuted) >= abs(diff) - 1e-12
+            observed.append(diff)
+            p_values.append((n_extreme + 1) / (N_PERMUTATIONS + 1))
+    return np.array(observed), np.array(p_values)
+
+
+def make_ordinal(rng, n_classes=4):
+    y_true = rng.integers(0, n_classes, size=N_DONORS).astype(float)
+    noise = rng.integers(-1, 2, size=(N_DONORS, N_SUBMISSIONS))
+    y_pred = np.clip(y_true[:, None] + noise, 0, n_classes - 1).astype(float)
+    return y_true, y_pred
+
+
+def make_continuous(rng):
+    y_true = rng.uniform(0, 100, size=N_DONORS)
+    scale = np.linspace(5, 30, N_SUBMISSIONS)
+    y_pred = y_true[:, None] + rng.normal(0, 1, size=(N_DONORS, N_SUBMISSIONS)) * scale
+    return y_true, y_pred
+
+
+@pytest.mark.parametrize("with_missing", [False, True])
+@pytest.mark.parametrize(
+    "metric, reference, make_data",
+    [
+        ("qwk", qwk, make_ordinal),
+        ("ccc", concordance_correlation_coefficient, make_continuous),
+    ],
+)
+def test_matches_brute_force(metric, reference, make_data, with_missing):
+    rng = np.random.default_rng(0)
+    y_true, y_pred = make_data(rng)
+    y_true[:3] = np.nan
+    if with_missing:
+        y_pred[5:8, 1] = np.nan
+        y_pred[20, 3] = np.nan
+
+    pairs, observed, p_values = paired_permutation_test(
+        y_true,
+        y_pred,
+        metric=metric,
+        n_permutations=N_PERMUTATIONS,
+        batch_size=64,
+        seed=SEED,
+    )
+    expected_observed, expected_p_values = brute_force(y_true, y_pred, reference)
+    assert pairs.tolist() == [
+        [a, b] for a in range(N_SUBMISSIONS) for b in range(a + 1, N_SUBMISSIONS)
+    ]
+    np.testing.assert_allclose(observed, expected_observed, atol=1e-12)
+    np.testing.assert_array_equal(p_values, expected_p_values)
+
+
+def test_compare_submissions_excludes_missing():
+    target = TARGET_SPECS["LATE"]
+    rng = np.random.default_rng(1)
+    donors = pd.Index([f"donor_{i}" for i in range(N_DONORS)])
+    truth = pd.Series(rng.choice(target.labels, size=N_DONORS), index=donors)
+    truth.iloc[:2] = "Unclassifiable"
+    predictions = pd.DataFrame(
+        {
+            name: rng.choice(target.labels, size=N_DONORS)
+            for name in ["team_a", "team_b", "team_c"]
+        },
+        index=donors,
+    )
+    predictions.loc[donors[-5:], "team_c"] = np.nan
+    # Donors without a ranked groundtruth are excluded whatever is predicted.
+    predictions.loc[donors[:2], "team_a"] = "Unclassifiable"
+
+    results = compare_submissions(truth, predictions, target, n_permutations=99)
+    assert len(results) == 3
+    assert results["p_value"].between(0, 1).all()
+    assert results["p_adjusted"].between(0, 1).all()
+    # team_c is compared on the donors it predicted.
+    expected = compare_submissions(
+        truth.iloc[:-5], predictions.iloc[:-5], target, n_permutations=99
+    )
+    np.testing.assert_allclose(
+        results.loc[results["submission_b"] == "team_c", "difference"],
+        expected.loc[expected["submission_b"] == "team_c", "difference"],
+    )
+
+
+def test_compare_submissions_rejects_unranked_predictions():
+    target = TARGET_SPECS["LATE"]
+    donors = pd.Index([f"donor_{i}" for i in range(N_DONORS)])
+    truth = pd.Series(target.labels[0], index=donors)
+    predictions = pd.DataFrame(
+        {"team_a": truth, "team_b": truth, "team_c": truth}, index=donors
+    )
+    predictions.loc[donors[3], "team_b"] = "Unclassifiable"
+    with pytest.raises(ValueError, match="unranked or unknown labels: team_b$"):
+        compare_submissions(truth, predictions, target, n_permutations=99)
+
+
+def test_adjust_pvalues_ignores_nan():
+    p_values = np.array([0.01, np.nan, 0.04, 0.03])
+    np.testing.assert_allclose(
+        adjust_pvalues(p_values, "holm"), [0.03, np.nan, 0.06, 0.06]
+    )
+    np.testing.assert_allclose(
+        adjust_pvalues(p_values, "fdr_bh"), [0.03, np.nan, 0.04, 0.04]
+    )
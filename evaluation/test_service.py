@@ -0,0 +1,95 @@
+"""Round-trip tests for the resident service and its client."""
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+import validate
+from service import ServiceError, request_results
+from task_registry import TASK_SPECS
+
+EVALUATION_DIR = os.path.dirname(os.path.abspath(__file__))
+TASK1 = TASK_SPECS["task1"]
+TASK1_NUMBER = TASK1.task_numbers[0]
+
+
+def run_client(*args, socket_path):
+    return subprocess.run(
+        [sys.executable, "client.py", *args],
+        cwd=EVALUATION_DIR,
+        env={**os.environ, "SEA_AD_EVAL_SOCKET": socket_path},
+        capture_output=True,
+        text=True,
+    )
+
+
+@pytest.fixture
+def files(make_groundtruth, make_predictions, write_files):
+    truth = make_groundtruth()
+    return write_files(truth, make_predictions(truth, TASK1))
+
+
+@pytest.fixture
+def service(tmp_path, files):
+    """A running service, yielding its socket path."""
+    socket_path = str(tmp_path / "eval.sock")
+    gt_file, _ = files
+    proc = subprocess.Popen(
+        [sys.executable, "service.py", "-g", gt_file, "-s", socket_path, "-w", "1"],
+        cwd=EVALUATION_DIR,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        for _ in range(300):
+            if os.path.exists(socket_path):
+                break
+            assert proc.poll() is None, "service exited"
+            time.sleep(0.1)
+        yield socket_path
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def test_request_results(service, files):
+    gt_file, pred_file = files
+    res = request_results("validate", TASK1_NUMBER, gt_file, pred_file, service)
+    assert res == validate.get_results(TASK1_NUMBER, gt_file, pred_file)
+    assert res["submission_status"] == "VALIDATED"
+
+
+def test_service_error_is_raised(service, files, tmp_path):
+    _, pred_file = files
+    with pytest.raises(ServiceError, match="FileNotFoundError"):
+        request_results(
+            "validate", TASK1_NUMBER, str(tmp_path / "missing.csv"), pred_file, service
+        )
+
+
+def test_client_uses_service_or_falls_back(service, files, tmp_path):
+    gt_file, pred_file = files
+    for socket_path in [service, str(tmp_path / "no-service.sock")]:
+        output_file = tmp_path / "results.json"
+        proc = run_client(
+            "score",
+            *["-p", pred_file, "-g", gt_file, "-o", str(output_file)],
+            socket_path=socket_path,
+        )
+        assert proc.returncode == 0, proc.stderr
+        assert json.loads(output_file.read_text())["submission_status"] == "SCORED"
+        output_file.unlink()
+
+
+def test_client_reports_service_error(service, files, tmp_path):
+    _, pred_file = files
+    output_file = tmp_path / "results.json"
+    proc = run_client(
+        "validate",
+        *["-p", pred_file, "-g", str(tmp_path / "missing.csv"), "-o", str(output_file)],
+        socket_path=service,
+    )
+    assert proc.returncode == 1
+    assert "Service failed to handle the request: FileNotFoundError" in proc.stderr
+    assert not output_file.exists()
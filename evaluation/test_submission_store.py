@@ -0,0 +1,50 @@
+"""Tests for the columnar submission store."""
+import numpy as np
+import pandas as pd
+from submission_store import SubmissionStore, build_store
+from task_registry import ID_COL, TARGET_SPECS
+
+N_DONORS = 20
+
+
+def test_build_store(tmp_path, make_groundtruth):
+    truth = make_groundtruth(N_DONORS)
+    truth.loc[0, TARGET_SPECS["NeuN"].truth_col] = np.nan
+    gt_file = tmp_path / "groundtruth.csv"
+    truth.to_csv(gt_file, index=False)
+    donors = truth[ID_COL]
+
+    pred_dir = tmp_path / "submissions"
+    (pred_dir / "team_b").mkdir(parents=True)
+    adnc = TARGET_SPECS["ADNC"]
+    complete = pd.DataFrame({ID_COL: donors, adnc.pred_col: truth[adnc.truth_col]})
+    complete.to_csv(pred_dir / "team_a.csv", index=False)
+    # Missing the first 3 donors, plus an unknown donor.
+    partial = pd.concat(
+        [complete.iloc[3:], pd.DataFrame({ID_COL: ["x"], adnc.pred_col: ["Low"]})]
+    )
+    partial.to_parquet(pred_dir / "team_b" / "predictions.parquet")
+    complete.drop(columns=ID_COL).to_csv(pred_dir / "no_ids.csv", index=False)
+    late = TARGET_SPECS["LATE"]
+    unranked = complete.assign(**{late.pred_col: "Unclassifiable"})
+    unranked.to_csv(pred_dir / "unranked.csv", index=False)
+
+    manifest = build_store(str(pred_dir), str(gt_file), str(tmp_path / "store"))
+    assert manifest["submissions"] == ["team_a", "team_b"]
+    assert manifest["failed_submissions"] == {
+        "no_ids": "ValueError: Missing the 'Donor ID' column.",
+        "unranked": (
+            f"ValueError: Found {N_DONORS} unranked or unknown label(s) "
+            "in column 'predicted LATE'."
+        ),
+    }
+
+    store = SubmissionStore(str(tmp_path / "store"))
+    assert store.predictions("ADNC").dtype == np.int8
+    assert store.complete_submissions("ADNC").tolist() == ["team_a"]
+    y_true, y_pred = store.values("ADNC")
+    np.testing.assert_array_equal(y_pred[:, 0], y_true)
+    np.testing.assert_array_equal(y_pred[3:, 1], y_true[3:])
+    assert np.isnan(y_pred[:3, 1]).all()
+    # Same groundtruth as task 2 scoring.
+    assert store.truth("NeuN")[0] == 0
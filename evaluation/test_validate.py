@@ -0,0 +1,55 @@
+"""Tests for validating prediction files."""
+import pyarrow as pa
+import pyarrow.feather as feather
+import pytest
+import score
+import validate
+from task_registry import TARGET_SPECS, TASK_SPECS
+
+TASK1 = TASK_SPECS["task1"]
+TASK1_NUMBER = TASK1.task_numbers[0]
+TASK2 = TASK_SPECS["task2"]
+TASK2_NUMBER = TASK2.task_numbers[0]
+
+
+@pytest.mark.parametrize("extension", [".parquet", ".arrow"])
+def test_truncated_binary_file_is_invalid(
+    tmp_path, make_groundtruth, make_predictions, write_files, extension
+):
+    truth = make_groundtruth()
+    pred = make_predictions(truth, TASK1)
+    gt_file, _ = write_files(truth, pred)
+    pred_file = tmp_path / f"predictions{extension}"
+    if extension == ".parquet":
+        pred.to_parquet(pred_file)
+    else:
+        feather.write_feather(pa.Table.from_pandas(pred), pred_file)
+    assert (
+        validate.get_results(TASK1_NUMBER, gt_file, str(pred_file))["submission_status"]
+        == "VALIDATED"
+    )
+
+    # E.g. a container killed while writing its predictions.
+    content = pred_file.read_bytes()
+    pred_file.write_bytes(content[: len(content) // 2])
+    res = validate.get_results(TASK1_NUMBER, gt_file, str(pred_file))
+    assert res["submission_status"] == "INVALID"
+    assert res["submission_errors"].startswith("Prediction file could not be read")
+
+
+def test_missing_optional_continuous_value_is_invalid(
+    make_groundtruth, make_predictions, write_files
+):
+    truth = make_groundtruth()
+    pred = make_predictions(truth, TASK2)
+    pred.loc[:2, TARGET_SPECS["aSyn"].pred_col] = None
+    gt_file, pred_file = write_files(truth, pred)
+
+    # Validation and scoring agree.
+    res = validate.get_results(TASK2_NUMBER, gt_file, pred_file)
+    assert res["submission_status"] == "INVALID"
+    assert res["submission_errors"] == (
+        "Found 3 missing value(s) in column 'predicted aSyn'."
+    )
+    res = score.get_results(TASK2_NUMBER, gt_file, pred_file)
+    assert res["submission_status"] == "INVALID"
@@ -5,8 +5,8 @@ Script is currently designed for validating submission for a single-
 task challenge.
 
 At a minimum, you will need to:
-    1. Define the expected data structures (see GROUNDTRUTH_COLS and
-       PREDICTION_COLS)
+    1. Define the expected data structures (see TARGETS and TASKS in
+       task_registry.py)
     2. Customize validate_task1() to fit your specific validation needs
     3. Add helper functions and manage dependencies as needed for your
        validation process
@@ -21,36 +21,18 @@ import numpy as np
 import pandas as pd
 import typer
 from cnb_tools import validation_toolkit as vtk
+from donor_index import check_keys, load_truth_index
+from prediction_io import read_predictions
+from task_registry import ID_COL, TASK_BY_NUMBER, TASK_SPECS
 from typing_extensions import Annotated
 
-# Groundtruth columns and data type.
-GROUNDTRUTH_COLS = {
-    "Donor ID": str,
-}
+TASK1 = TASK_SPECS["task1"]
+TASK2 = TASK_SPECS["task2"]
 
-# Expected columns and data types for predictions file.
-TASK1_PRED_COLS = {
-    "Donor ID": str,
-    "predicted ADNC": str,
-    "predicted Braak": str,
-    "predicted CERAD": str,
-    "predicted Thal": str,
-}
-TASK2_PRED_COLS = {
-    "Donor ID": str,
-    "predicted 6e10": float,
-    "predicted AT8": float,
-    "predicted GFAP": float,
-    "predicted NeuN": float,
-}
-OPTIONAL_COLS = {
-    "predicted LATE": str,
-    "predicted Lewy": str,
-    "predicted aSyn": float,
-    "predicted pTDP43": float,
-}
 
-ID_COL = "Donor ID"
+def load_groundtruth(gt_file: str) -> pd.Index:
+    """Return the (cached) index of groundtruth IDs."""
+    return load_truth_index(gt_file)
 
 
 def check_acceptable_value(col: pd.Series, acceptable_values: set) -> str:
@@ -65,89 +47,36 @@ def check_acceptable_value(col: pd.Series, acceptable_values: set) -> str:
     return ""
 
 
+def check_missing_values(col: pd.Series) -> str:
+    """Check that there is a value for every prediction."""
+    n_missing = col.isna().sum()
+    if n_missing:
+        return f"Found {n_missing} missing value(s) in column '{col.name}'."
+    return ""
+
+
 def validate_task1(gt_file: str, pred_file: str) -> list[str] | filter:
     """Validate task 1."""
     errors = []
-    truth = pd.read_csv(
-        gt_file,
-        usecols=GROUNDTRUTH_COLS,
-        dtype=GROUNDTRUTH_COLS,
-    )
+    truth = load_groundtruth(gt_file)
     try:
-        cols_to_use = [*TASK1_PRED_COLS] + [*OPTIONAL_COLS]
-        pred = pd.read_csv(
-            pred_file,
-            usecols=lambda colname: colname in cols_to_use,
-            float_precision="round_trip",
-        )
-        assert np.isin([*TASK1_PRED_COLS], pred.columns).all()
+        pred = read_predictions(pred_file, usecols=TASK1.usecols)
+        assert np.isin([*TASK1.pred_cols], pred.columns).all()
     except AssertionError:
         errors.append(
             f"Prediction file is missing one or more required columns. "
-            f"Expecting: {str(TASK1_PRED_COLS)}."
+            f"Expecting: {dict(TASK1.pred_cols)}."
         )
+    except (OSError, ValueError) as err:
+        # Unreadable or truncated file (pyarrow's ArrowInvalid is a ValueError).
+        errors.append(f"Prediction file could not be read: {err}")
     else:
-        errors.append(vtk.check_duplicate_keys(pred[ID_COL]))
-        errors.append(vtk.check_missing_keys(truth[ID_COL], pred[ID_COL]))
-        errors.append(vtk.check_unknown_keys(truth[ID_COL], pred[ID_COL]))
-        errors.append(
-            check_acceptable_value(
-                pred["predicted ADNC"],
-                {"Not AD", "Low", "Intermediate", "High"},
-            )
-        )
-        errors.append(
-            check_acceptable_value(
-                pred["predicted Braak"],
-                {
-                    "Braak 0",
-                    "Braak I",
-                    "Braak II",
-                    "Braak III",
-                    "Braak IV",
-                    "Braak V",
-                    "Braak VI",
-                },
-            )
-        )
-        errors.append(
-            check_acceptable_value(
-                pred["predicted CERAD"],
-                {"Absent", "Sparse", "Moderate", "Frequent"},
-            )
-        )
-        errors.append(
-            check_acceptable_value(
-                pred["predicted Thal"],
-                {"Thal 0", "Thal 1", "Thal 2", "Thal 3", "Thal 4", "Thal 5"},
-            )
-        )
-        if "predicted LATE" in pred.columns:
-            errors.append(
-                check_acceptable_value(
-                    pred["predicted LATE"],
-                    {
-                        "Not Identified",
-                        "LATE Stage 1",
-                        "LATE Stage 2",
-                        "LATE Stage 3",
-                        "Unclassifiable",  # TODO: check with Allen folks
-                    },
-                )
-            )
-        if "predicted Lewy" in pred.columns:
+        errors.extend(check_keys(truth, pred[ID_COL]).errors)
+        for target in TASK1.targets_in(pred.columns):
             errors.append(
                 check_acceptable_value(
-                    pred["predicted Lewy"],
-                    {
-                        "Not Identified (olfactory bulb assessed)",
-                        "Olfactory bulb only",
-                        "Amygdala-predominant",
-                        "Brainstem-predominant",
-                        "Limbic (Transitional)",
-                        "Neocortical (Diffuse)",
-                        "Not Identified (olfactory bulb not assessed)",  # TODO: check with Allen folks
-                    },
+                    pred[target.pred_col],
+                    target.accepted_labels,
                 )
             )
     # Remove any empty strings from the list before return.
@@ -157,77 +86,75 @@ def validate_task1(gt_file: str, pred_file: str) -> list[str] | filter:
 def validate_task2(gt_file: str, pred_file: str) -> list[str] | filter:
     """Validate task 2."""
     errors = []
-    truth = pd.read_csv(
-        gt_file,
-        usecols=GROUNDTRUTH_COLS,
-        dtype=GROUNDTRUTH_COLS,
-    )
+    truth = load_groundtruth(gt_file)
     try:
-        cols_to_use = [*TASK2_PRED_COLS] + [*OPTIONAL_COLS]
-        pred = pd.read_csv(
-            pred_file,
-            usecols=lambda colname: colname in cols_to_use,
-            float_precision="round_trip",
-        )
-        assert np.isin([*TASK2_PRED_COLS], pred.columns).all()
+        pred = read_predictions(pred_file, usecols=TASK2.usecols)
+        assert np.isin([*TASK2.pred_cols], pred.columns).all()
     except AssertionError:
         errors.append(
             f"Prediction file is missing one or more required columns. "
-            f"Expecting: {str(TASK2_PRED_COLS)}."
+            f"Expecting: {dict(TASK2.pred_cols)}."
         )
+    except (OSError, ValueError) as err:
+        # Unreadable or truncated file (pyarrow's ArrowInvalid is a ValueError).
+        errors.append(f"Prediction file could not be read: {err}")
     else:
-        errors.append(vtk.check_duplicate_keys(pred[ID_COL]))
-        errors.append(vtk.check_missing_keys(truth[ID_COL], pred[ID_COL]))
-        errors.append(vtk.check_unknown_keys(truth[ID_COL], pred[ID_COL]))
-        for colname in TASK2_PRED_COLS:
-            if colname.startswith("predicted"):
-                errors.append(
-                    vtk.check_values_range(
-                        pred[colname],
-                        min_val=0,
-                        max_val=100,
-                    )
-                )
-        if "predicted aSyn" in pred.columns:
-            errors.append(
-                vtk.check_values_range(
-                    pred["predicted aSyn"],
-                    min_val=0,
-                    max_val=100,
-                )
-            )
-        if "predicted pTDP43" in pred.columns:
+        errors.extend(check_keys(truth, pred[ID_COL]).errors)
+        for target in TASK2.targets_in(pred.columns):
+            # Scoring rejects missing values, optional targets included.
+            errors.append(check_missing_values(pred[target.pred_col]))
+            min_val, max_val = target.value_range
             errors.append(
                 vtk.check_values_range(
-                    pred["predicted pTDP43"],
-                    min_val=0,
-                    max_val=100,
+                    pred[target.pred_col],
+                    min_val=min_val,
+                    max_val=max_val,
                 )
             )
     # Remove any empty strings from the list before return.
     return filter(None, errors)
 
 
+# Validation function of each challenge task number.
+VALIDATION_FUNCS = {
+    task_number: {"task1": validate_task1, "task2": validate_task2}[task.name]
+    for task_number, task in TASK_BY_NUMBER.items()
+}
+
+
 def validate(task_number: int, gt_file: str, pred_file: str) -> list[str] | filter:
     """
     Routes validation to the appropriate task-specific function.
     """
-    validation_func = {
-        9616048: validate_task1,
-        9616135: validate_task1,
-        9616049: validate_task2,
-        9616136: validate_task2,
-        9617459: validate_task1,
-        9617461: validate_task1,
-        9617460: validate_task2,
-        9617463: validate_task2,
-    }.get(task_number)
-
+    validation_func = VALIDATION_FUNCS.get(task_number)
     if validation_func:
         return validation_func(gt_file=gt_file, pred_file=pred_file)
     return [f"Invalid challenge task number specified: `{task_number}`"]
 
 
+def get_results(task_number: int, gt_file: str, pred_file: str) -> dict:
+    """
+    Validates the predictions file and returns the contents of the
+    results JSON file (validation status and errors).
+    """
+    errors = validate(
+        task_number=task_number,
+        gt_file=gt_file,
+        pred_file=pred_file,
+    )
+
+    invalid_reasons = "\n".join(errors)
+    status = "INVALID" if invalid_reasons else "VALIDATED"
+
+    # Truncate validation errors if >500 (char limit for sending Synapse email)
+    if len(invalid_reasons) > 500:
+        invalid_reasons = invalid_reasons[:496] + "..."
+    return {
+        "submission_status": status,
+        "submission_errors": invalid_reasons,
+    }
+
+
 def main(
     predictions_file: Annotated[
         str,
@@ -263,26 +190,15 @@ def main(
     ] = "results.json",
 ):
     """Validates the predictions file in preparation for evaluation."""
-    errors = validate(
+    res = get_results(
         task_number=task_number,
         gt_file=groundtruth_file,
         pred_file=predictions_file,
     )
 
-    invalid_reasons = "\n".join(errors)
-    status = "INVALID" if invalid_reasons else "VALIDATED"
-
-    # Truncate validation errors if >500 (char limit for sending Synapse email)
-    if len(invalid_reasons) > 500:
-        invalid_reasons = invalid_reasons[:496] + "..."
-    res = {
-        "submission_status": status,
-        "submission_errors": invalid_reasons,
-    }
-
     with open(output_file, "w", encoding="utf-8") as out:
         out.write(json.dumps(res))
-    print(status)
+    print(res["submission_status"])
 
 
 if __name__ == "__main__":
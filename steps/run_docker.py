@@ -3,15 +3,26 @@
 from __future__ import print_function
 
 import argparse
+import csv
 import glob
+import itertools
 import json
 import os
 import requests
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 
 import docker
 import synapseclient
 
+# Accepted names for the predictions file, in order of preference; CSV
+# remains the default, but large outputs can be written as Parquet or
+# Arrow IPC instead (see evaluation/prediction_io.py).
+PREDICTION_FILES = ["predictions.csv", "predictions.parquet", "predictions.arrow"]
+ID_COL = "Donor ID"
+# Number of CSV rows (after the header) checked by check_predictions_file.
+CSV_SAMPLE_ROWS = 1000
+
 
 def create_log_file(log_filename, log_text=None):
     """Create log file"""
@@ -78,10 +89,97 @@ def remove_docker_image(client, image_name):
         print(f"Unable to remove image: {image_name}")
 
 
-def run_docker(syn, args, docker_client, output_dir_to_mount, timeout=10800):
+def check_predictions_file(pred_file):
+    """Quick structural check of the predictions file.
+
+    Catches unreadable or empty files and missing ID/prediction columns
+    as soon as the container exits, without the evaluation dependencies.
+    Only the header and the first CSV_SAMPLE_ROWS rows of a CSV are read;
+    full validation (per task) is still done by the validation step.
+    Returns an error message, if any (default is an empty string).
+    """
+    extension = os.path.splitext(pred_file)[1]
+    if extension in (".parquet", ".arrow"):
+        # Parquet files start and end with "PAR1", and Arrow IPC files with
+        # "ARROW1", so a truncated file lacks its trailing magic. Arrow IPC
+        # streams start with a continuation marker and have no trailing magic.
+        if extension == ".parquet":
+            magics = {b"PAR1": b"PAR1"}
+        else:
+            magics = {b"ARROW1": b"ARROW1", b"\xff" * 4: b""}
+        with open(pred_file, "rb") as f:
+            head = f.read(6)
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(size - 6, 0))
+            tail = f.read()
+        if not any(
+            head.startswith(head_magic)
+            and tail.endswith(tail_magic)
+            and size >= len(head_magic) + len(tail_magic)
+            for head_magic, tail_magic in magics.items()
+        ):
+            return f"{os.path.basename(pred_file)} is not a valid file."
+        return ""
+
+    try:
+        # "utf-8-sig" drops the byte order mark written by e.g. Excel or R.
+        with open(pred_file, newline="", encoding="utf-8-sig") as f:
+            # Blank lines are skipped, as pandas does.
+            reader = (row for row in csv.reader(f) if row)
+            header = next(reader, None)
+            if not header:
+                return "Predictions file is empty."
+            rows = list(itertools.islice(reader, CSV_SAMPLE_ROWS))
+    except (csv.Error, UnicodeDecodeError) as err:
+        return f"Predictions file could not be parsed: {err}"
+
+    errors = []
+    if ID_COL not in header:
+        errors.append(f"Predictions file is missing the '{ID_COL}' column.")
+    if not any(colname.startswith("predicted ") for colname in header):
+        errors.append("Predictions file does not have any 'predicted' columns.")
+    if len(set(header)) != len(header):
+        errors.append("Predictions file has duplicate column names.")
+    if not rows:
+        errors.append("Predictions file does not have any predictions.")
+    malformed_rows = sum(len(row) != len(header) for row in rows)
+    if malformed_rows:
+        errors.append(
+            f"Found {malformed_rows} row(s) with a different number of "
+            "values than there are columns."
+        )
+    return "\n".join(errors)
+
+
+def finish_container(syn, args, container, log_filename):
+    """Save and upload the container logs, then remove the container."""
+    try:
+        log_text = container.logs()
+        create_log_file(log_filename, log_text=log_text)
+        store_log_file(syn, log_filename, args.parentid, store=args.store)
+        container.remove()
+    except Exception as err:
+        print(f"Unable to save logs or remove container {container.name}: {err}")
+
+
+def clean_up(syn, args, docker_client, container, log_filename):
+    """Finish the container, then remove the image it was running."""
+    finish_container(syn, args, container, log_filename)
+    remove_docker_image(docker_client, f"{args.docker_repository}@{args.docker_digest}")
+
+
+def run_docker(
+    syn, args, docker_client, output_dir_to_mount, timeout=10800, background=None
+):
     """Run Docker model.
 
     If model exceeds timeout (default 3 hours), stop the container.
+
+    Once the container has finished, its logs are saved and the container
+    and then the image are removed. If a `background` executor is given,
+    this clean-up is submitted to it as a single job, so that the caller
+    can process the outputs in the meantime. On failure, the image is left
+    for the caller to remove.
     """
     docker_image = f"{args.docker_repository}@{args.docker_digest}"
     container_name = f"{args.submissionid}-docker_run"
@@ -126,10 +224,12 @@ def run_docker(syn, args, docker_client, output_dir_to_mount, timeout=10800):
 
         # Wait for the container to finish
         container.wait(timeout=timeout)
-        log_text = container.logs()
-        create_log_file(log_filename, log_text=log_text)
-        store_log_file(syn, log_filename, args.parentid, store=args.store)
-        container.remove()
+        if background is not None:
+            background.submit(
+                clean_up, syn, args, docker_client, container, log_filename
+            )
+        else:
+            clean_up(syn, args, docker_client, container, log_filename)
         return True, ""
     except requests.exceptions.ConnectionError:
         log_text = (
@@ -169,25 +269,47 @@ def main(syn, args):
             registry="https://docker.synapse.org",
         )
 
-        with tempfile.TemporaryDirectory(dir=os.getcwd()) as output_dir:
-            # Update permissions so that non-root container can write to it
-            new_permissions = 0o777
-            os.chmod(output_dir, new_permissions)
+        # Log upload and container/image clean-up run in the background,
+        # overlapping with checking the predictions file; leaving the
+        # `with` block waits for them to finish.
+        with ThreadPoolExecutor(max_workers=2) as background:
+            with tempfile.TemporaryDirectory(dir=os.getcwd()) as output_dir:
+                # Update permissions so that non-root container can write to it
+                new_permissions = 0o777
+                os.chmod(output_dir, new_permissions)
 
-            success, run_error = run_docker(syn, args, client, output_dir)
-            if not success:
-                status = "INVALID"
-                invalid_reasons = run_error
-            else:
-                output_file = glob.glob(os.path.join(output_dir, "predictions.csv"))
-                if output_file:
-                    os.rename(output_file[0], os.path.join(os.getcwd(), "predictions.csv"))
-                else:
+                success, run_error = run_docker(
+                    syn, args, client, output_dir, background=background
+                )
+                if not success:
                     status = "INVALID"
-                    invalid_reasons = (
-                        "Container did not generate a file called predictions.csv"
-                    )
-        remove_docker_image(client, f"{args.docker_repository}@{args.docker_digest}")
+                    invalid_reasons = run_error
+                else:
+                    output_file = [
+                        filepath
+                        for filename in PREDICTION_FILES
+                        for filepath in glob.glob(os.path.join(output_dir, filename))
+                    ]
+                    if output_file:
+                        invalid_reasons = check_predictions_file(output_file[0])
+                        if invalid_reasons:
+                            status = "INVALID"
+                        os.rename(
+                            output_file[0],
+                            os.path.join(os.getcwd(), os.path.basename(output_file[0])),
+                        )
+                    else:
+                        status = "INVALID"
+                        invalid_reasons = (
+                            "Container did not generate a file called "
+                            f"{' or '.join(PREDICTION_FILES)}"
+                        )
+            if not success:
+                background.submit(
+                    remove_docker_image,
+                    client,
+                    f"{args.docker_repository}@{args.docker_digest}",
+                )
 
     with open("results.json", "w") as out:
         out.write(